@@ -0,0 +1,435 @@
+from array import array
+from timing import Timer
+
+# index of the shared sentinel leaf, slot 0 of every array
+NIL = 0
+
+
+# class ArrayRedBlackTree implements the Red Black Tree operations on parallel
+# arrays (struct-of-arrays) instead of one Node object per key
+class ArrayRedBlackTree:
+    '''
+    Red-black tree whose nodes are slots in parallel typed arrays:
+    - keys: the key of each node ('q' ints or 'd' floats; a plain list
+      when `typecode` is None, for arbitrary comparable keys)
+    - left/right/parent: child & parent slot indices, NIL (0) for none
+    - color: one byte per node, 1 -> Red, 0 -> Black
+    - height: one byte per node, the height of the subtree rooted there
+      (0 for NIL), kept up to date by every insert, delete & rotation so
+      tree_height is O(1)
+    Slot 0 is the black NIL sentinel. Slots of deleted nodes go on a free
+    list, threaded through the `left` array, and are reused by insert.
+    Nodes are referred to by slot index: search returns NIL on a miss.
+    With multiset=True a `counts` array holds the copies of each key: a
+    duplicate insert bumps the count instead of taking a slot, & delete
+    drops one copy at a time.
+    '''
+
+    def __init__(self, typecode: str = 'q', multiset: bool = False):
+        self.typecode = typecode
+        self.multiset = multiset
+        self.counts = array('i', [0]) if multiset else None
+        self.keys = array(typecode, [0]) if typecode else [None]
+        self.left = array('i', [NIL])
+        self.right = array('i', [NIL])
+        self.parent = array('i', [NIL])
+        self.color = bytearray(1)  # sentinel is black
+        self.height = bytearray(1)  # sentinel has height 0
+        self.NULL = NIL
+        self.root = NIL
+        self.free = NIL  # head of the free slot list
+
+    # take a slot from the free list or grow the arrays by one
+    def _new_node(self, key):
+        node = self.free
+        if node != NIL:
+            self.free = self.left[node]
+            self.keys[node] = key
+            self.left[node] = NIL
+            self.right[node] = NIL
+            self.parent[node] = NIL
+            self.color[node] = 1
+            self.height[node] = 1
+            if self.counts is not None:
+                self.counts[node] = 1
+        else:
+            node = len(self.left)
+            self.keys.append(key)
+            self.left.append(NIL)
+            self.right.append(NIL)
+            self.parent.append(NIL)
+            self.color.append(1)
+            self.height.append(1)
+            if self.counts is not None:
+                self.counts.append(1)
+        return node
+
+    # return a slot to the free list
+    def _free_node(self, node):
+        self.left[node] = self.free
+        self.right[node] = NIL
+        self.parent[node] = NIL
+        self.free = node
+
+    def _update_path(self, node, until=None):
+        '''
+        Recompute heights from node up towards the root: every node up to &
+        including until, then (or from node on when until is None) only as
+        long as the heights change, since a height that stays the same
+        leaves every height above it as it was.
+        '''
+        left, right, parent, height = self.left, self.right, self.parent, self.height
+        settled = until is None
+        while node != NIL:
+            left_height = height[left[node]]
+            right_height = height[right[node]]
+            new_height = (left_height if left_height > right_height else right_height) + 1
+            if settled and new_height == height[node]:
+                return
+            height[node] = new_height
+            if node == until:
+                settled = True
+            node = parent[node]
+
+    # find the node with the minimum key
+    def minimum(self, node):
+        left = self.left
+        while left[node] != NIL:
+            node = left[node]
+        return node
+
+    # find the node with the maximum key
+    def maximum(self, node):
+        right = self.right
+        while right[node] != NIL:
+            node = right[node]
+        return node
+
+    # rotate left at node x
+    def left_rotate(self, x):
+        left, right, parent = self.left, self.right, self.parent
+        y = right[x]
+        right[x] = left[y]
+        if left[y] != NIL:
+            parent[left[y]] = x
+
+        parent[y] = parent[x]
+        if parent[x] == NIL:
+            self.root = y
+        elif x == left[parent[x]]:
+            left[parent[x]] = y
+        else:
+            right[parent[x]] = y
+        left[y] = x
+        parent[x] = y
+        # x is now below y, so refresh x first
+        height = self.height
+        left_height, right_height = height[left[x]], height[right[x]]
+        height[x] = x_height = (left_height if left_height > right_height else right_height) + 1
+        right_height = height[right[y]]
+        height[y] = (x_height if x_height > right_height else right_height) + 1
+
+    # rotate right at node x
+    def right_rotate(self, x):
+        left, right, parent = self.left, self.right, self.parent
+        y = left[x]
+        left[x] = right[y]
+        if right[y] != NIL:
+            parent[right[y]] = x
+
+        parent[y] = parent[x]
+        if parent[x] == NIL:
+            self.root = y
+        elif x == right[parent[x]]:
+            right[parent[x]] = y
+        else:
+            left[parent[x]] = y
+        right[y] = x
+        parent[x] = y
+        height = self.height
+        left_height, right_height = height[left[x]], height[right[x]]
+        height[x] = x_height = (left_height if left_height > right_height else right_height) + 1
+        left_height = height[left[y]]
+        height[y] = (left_height if left_height > x_height else x_height) + 1
+
+    def rb_transplant(self, u, v):
+        left, right, parent = self.left, self.right, self.parent
+        if parent[u] == NIL:
+            self.root = v
+        elif u == left[parent[u]]:
+            left[parent[u]] = v
+        else:
+            right[parent[u]] = v
+        parent[v] = parent[u]
+
+    # fix the rb tree modified by the delete operation, returning the root of
+    # the subtree the last rotation reshaped (NIL if nothing was rotated)
+    def fix_delete(self, x):
+        left, right, parent, color = self.left, self.right, self.parent, self.color
+        top = NIL
+        while x != self.root and color[x] == 0:
+            if x == left[parent[x]]:
+                s = right[parent[x]]
+                if color[s] == 1:
+                    # case 3.1
+                    color[s] = 0
+                    color[parent[x]] = 1
+                    self.left_rotate(parent[x])
+                    top = parent[parent[x]]
+                    s = right[parent[x]]
+
+                if color[left[s]] == 0 and color[right[s]] == 0:
+                    # case 3.2
+                    color[s] = 1
+                    x = parent[x]
+                else:
+                    if color[right[s]] == 0:
+                        # case 3.3
+                        color[left[s]] = 0
+                        color[s] = 1
+                        self.right_rotate(s)
+                        s = right[parent[x]]
+
+                    # case 3.4
+                    color[s] = color[parent[x]]
+                    color[parent[x]] = 0
+                    color[right[s]] = 0
+                    self.left_rotate(parent[x])
+                    top = parent[parent[x]]
+                    x = self.root
+            else:
+                s = left[parent[x]]
+                if color[s] == 1:
+                    # case 3.1
+                    color[s] = 0
+                    color[parent[x]] = 1
+                    self.right_rotate(parent[x])
+                    top = parent[parent[x]]
+                    s = left[parent[x]]
+
+                if color[left[s]] == 0 and color[right[s]] == 0:
+                    # case 3.2
+                    color[s] = 1
+                    x = parent[x]
+                else:
+                    if color[left[s]] == 0:
+                        # case 3.3
+                        color[right[s]] = 0
+                        color[s] = 1
+                        self.left_rotate(s)
+                        s = left[parent[x]]
+
+                    # case 3.4
+                    color[s] = color[parent[x]]
+                    color[parent[x]] = 0
+                    color[left[s]] = 0
+                    self.right_rotate(parent[x])
+                    top = parent[parent[x]]
+                    x = self.root
+        color[x] = 0
+        return top
+
+    def delete_node_helper(self, node, key):
+        keys, left, right, parent, color = self.keys, self.left, self.right, self.parent, self.color
+        # find the node containing key
+        z = NIL
+        while node != NIL:
+            if keys[node] == key:
+                z = node
+
+            if keys[node] <= key:
+                node = right[node]
+            else:
+                node = left[node]
+
+        if z == NIL:
+            return False
+
+        counts = self.counts
+        if counts is not None and counts[z] > 1:
+            # drop one copy of a multiset key, the node stays
+            counts[z] -= 1
+            return True
+
+        y = z
+        y_original_color = color[y]
+        if left[z] == NIL:
+            x = right[z]
+            self.rb_transplant(z, right[z])
+        elif right[z] == NIL:
+            x = left[z]
+            self.rb_transplant(z, left[z])
+        else:
+            y = self.minimum(right[z])
+            y_original_color = color[y]
+            x = right[y]
+            if parent[y] == z:
+                parent[x] = y
+            else:
+                self.rb_transplant(y, right[y])
+                right[y] = right[z]
+                parent[right[y]] = y
+
+            self.rb_transplant(z, y)
+            left[y] = left[z]
+            parent[left[y]] = y
+            color[y] = color[z]
+
+        # the heights can shrink from where x now hangs up: y, when it took
+        # z's place, has a new subtree & so does every node between it & x
+        x_parent = parent[x]
+        self._update_path(x_parent, y if y != z else None)
+        if y_original_color == 0:
+            top = self.fix_delete(x)
+            # the rotations refresh the nodes they move, not the ones above,
+            # which all lie on the path up from the last one
+            if top != NIL:
+                self._update_path(parent[top], self.root)
+
+        self._free_node(z)
+        return True
+
+    # fix the red-black tree, returning the root of the subtree the rotations
+    # reshaped (NIL if nothing was rotated)
+    def fix_insert(self, k):
+        left, right, parent, color = self.left, self.right, self.parent, self.color
+        top = NIL
+        while color[parent[k]] == 1:
+            if parent[k] == right[parent[parent[k]]]:
+                u = left[parent[parent[k]]]  # uncle
+                if color[u] == 1:
+                    # case 3.1
+                    color[u] = 0
+                    color[parent[k]] = 0
+                    color[parent[parent[k]]] = 1
+                    k = parent[parent[k]]
+                else:
+                    if k == left[parent[k]]:
+                        # case 3.2.2
+                        k = parent[k]
+                        self.right_rotate(k)
+                    # case 3.2.1
+                    color[parent[k]] = 0
+                    color[parent[parent[k]]] = 1
+                    self.left_rotate(parent[parent[k]])
+                    top = parent[k]
+            else:
+                u = right[parent[parent[k]]]  # uncle
+
+                if color[u] == 1:
+                    # mirror case 3.1
+                    color[u] = 0
+                    color[parent[k]] = 0
+                    color[parent[parent[k]]] = 1
+                    k = parent[parent[k]]
+                else:
+                    if k == right[parent[k]]:
+                        # mirror case 3.2.2
+                        k = parent[k]
+                        self.left_rotate(k)
+                    # mirror case 3.2.1
+                    color[parent[k]] = 0
+                    color[parent[parent[k]]] = 1
+                    self.right_rotate(parent[parent[k]])
+                    top = parent[k]
+            if k == self.root:
+                break
+        color[self.root] = 0
+        return top
+
+    def search_tree_helper(self, node, key):
+        keys, left, right = self.keys, self.left, self.right
+        while node != NIL and key != keys[node]:
+            if key < keys[node]:
+                node = left[node]
+            else:
+                node = right[node]
+        return node
+
+    # insert the key to the tree in its appropriate position
+    # and fix the tree
+    def insert(self, key):
+        keys, left, right, counts = self.keys, self.left, self.right, self.counts
+        # Ordinary Binary Search Insertion
+        y = NIL
+        x = self.root
+
+        while x != NIL:
+            if counts is not None and key == keys[x]:
+                # one more copy, no slot is taken
+                counts[x] += 1
+                return
+            y = x
+            if key < keys[x]:
+                x = left[x]
+            else:
+                x = right[x]
+
+        node = self._new_node(key)  # new node must be red
+
+        # y is parent of x
+        self.parent[node] = y
+        if y == NIL:
+            self.root = node
+        elif key < keys[y]:
+            left[y] = node
+        else:
+            right[y] = node
+
+        # if new node is a root node, simply return
+        if y == NIL:
+            self.color[node] = 0
+            return
+
+        # the heights can only grow, by one, from y up until a node is
+        # already tall enough
+        height, parent = self.height, self.parent
+        ancestor, h = y, 2
+        while ancestor != NIL and height[ancestor] < h:
+            height[ancestor] = h
+            ancestor, h = parent[ancestor], h + 1
+
+        # if the grandparent is NIL, simply return
+        if parent[y] == NIL:
+            return
+
+        # Fix the tree
+        top = self.fix_insert(node)
+        # the rotations refresh the nodes they move; the heights above the
+        # subtree they reshaped can shrink
+        if top != NIL:
+            self._update_path(parent[top])
+
+    # search the tree for the key k
+    # and return the corresponding node index
+    def search(self, k):
+        return self.search_tree_helper(self.root, k)
+
+    # delete the node from the tree
+    def delete(self, data):
+        return self.delete_node_helper(self.root, data)
+
+    def clone(self):
+        '''
+        Return a copy of the tree. The nodes are slots of the arrays, so
+        copying the arrays (free list included) copies the whole tree in O(n)
+        without walking it.
+        '''
+        copy = type(self)(self.typecode, self.multiset)
+        if self.counts is not None:
+            copy.counts = self.counts[:]
+        copy.keys = self.keys[:]
+        copy.left = self.left[:]
+        copy.right = self.right[:]
+        copy.parent = self.parent[:]
+        copy.color = self.color[:]
+        copy.height = self.height[:]
+        copy.root = self.root
+        copy.free = self.free
+        return copy
+
+    def tree_height(self):
+        # height is maintained on every insert, delete & rotation, so this is O(1)
+        with Timer() as timer:
+            height = self.height[self.root]
+        return (height, timer.elapsed)
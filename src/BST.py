@@ -1,11 +1,13 @@
-import sys
-from datetime import datetime
-from file_utils import read_data_files, write_to_file, compute_avg, get_lines_to_write, remove_file
-
-sys.setrecursionlimit(30000)
+import heapq
+from operator import attrgetter
+from harness import average_exec_times, read_op_files, run_op
+from timing import Timer
+from tree_utils import check_sorted, iter_keys, keys_between, reverse_keys, run_lengths, search_many
 
 
 class Node:
+    __slots__ = ('val', 'left', 'right')
+
     def __init__(self, val=None):
         self.val = val
         self.left = None
@@ -14,318 +16,398 @@ class Node:
 
 # Binary Search Tree
 class BinarySearchTree:
-    def __init__(self, val=None):
+    # every node of the tree is itself a BinarySearchTree, so slots keep the
+    # per-node footprint down by dropping the instance __dict__
+    # size & height are kept up to date for the subtree rooted at each node
+    # count is the no of copies of val; it only goes above 1 in multiset mode,
+    # where a duplicate insert bumps the count instead of being rejected
+    __slots__ = ('val', 'left', 'right', 'size', 'height', 'count')
+
+    # multiset is only read on the root, the node the tree is used through, so
+    # it is a class attribute rather than a slot on every node: a multiset
+    # tree's root is a MultisetBinarySearchTree & the nodes below it are not
+    multiset = False
+
+    def __new__(cls, val=None, multiset: bool = False):
+        if multiset and not cls.multiset:
+            cls = MultisetBinarySearchTree
+        return super().__new__(cls)
+
+    def __init__(self, val=None, multiset: bool = False):
         self.val = val
         self.left = None
         self.right = None
+        self.count = 0 if val is None else 1
+        self.size = self.count
+        self.height = self.count
+
+    # no of keys, counting every copy in multiset mode
+    def __len__(self):
+        return self.size
+
+    # recompute size & height of this node from its children
+    def _update(self):
+        size = self.count
+        height = 0
+        if self.left is not None:
+            size += self.left.size
+            height = self.left.height
+        if self.right is not None:
+            size += self.right.size
+            if self.right.height > height:
+                height = self.right.height
+        self.size = size
+        self.height = height + 1
 
     def traverse_in_order(self, lst):
-        if self.left:
-            self.left.traverse_in_order(lst)
-        lst.append(self.val)
-        if self.right:
-            self.right.traverse_in_order(lst)
+        lst.extend(self)
         return lst
 
     def traverse_pre_order(self, lst):
-        lst.append(self.val)
-        if self.left:
-            self.left.traverse_pre_order(lst)
-        if self.right:
-            self.right.traverse_pre_order(lst)
+        if self.val is None:
+            return lst
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            lst.append(node.val)
+            # push right first so the left subtree is visited first
+            if node.right:
+                stack.append(node.right)
+            if node.left:
+                stack.append(node.left)
         return lst
 
     def traverse_post_order(self, lst):
-        if self.left:
-            self.left.traverse_post_order(lst)
-        if self.right:
-            self.right.traverse_post_order(lst)
-        lst.append(self.val)
+        if self.val is None:
+            return lst
+        # reversed (root, right, left) pre-order gives the post-order
+        stack = [self]
+        out = []
+        while stack:
+            node = stack.pop()
+            out.append(node.val)
+            if node.left:
+                stack.append(node.left)
+            if node.right:
+                stack.append(node.right)
+        out.reverse()
+        lst.extend(out)
         return lst
 
     def find_node_and_parent(self, val, parent=None):
         # returning the node and its parent so we can delete the node and reconstruct the tree from its parent
-        if val == self.val:
-            return self, parent
-        if val < self.val:
-            if self.left:
-                return self.left.find_node_and_parent(val, self)
-            else:
-                return False
-        else:
-            if self.right:
-                return self.right.find_node_and_parent(val, self)
+        if self.val is None:
+            return False
+        node = self
+        while node is not None:
+            if val == node.val:
+                return node, parent
+            parent = node
+            if val < node.val:
+                node = node.left
             else:
-                return False
+                node = node.right
+        return False
 
     def insert(self, val):
         # check if there is no root
         if self.val is None:
             self.val = val
-        # check where to insert
-        else:
+            self.count = 1
+            self.size = 1
+            self.height = 1
+            return
+        # walk down from the root to find where to insert, remembering the path
+        path = []
+        node = self
+        while True:
             # check for duplicate then stop and return
-            if val == self.val:
-                return 'No duplicates allowed in BST'
+            if val == node.val:
+                if not self.multiset:
+                    return 'No duplicates allowed in BST'
+                # one more copy: no new node, only the sizes on the path grow
+                node.count += 1
+                node.size += 1
+                for ancestor in path:
+                    ancestor.size += 1
+                return
+            path.append(node)
             # check if value to be inserted < currentNode's value
-            if val < self.val:
-                # check if there is a left node to currentNode if true then recurse
-                if self.left:
-                    self.left.insert(val)
+            if val < node.val:
+                # move to the left node if there is one
+                if node.left is not None:
+                    node = node.left
                 # insert where left of currentNode when currentNode.left=None
                 else:
-                    self.left = BinarySearchTree(val)
+                    node.left = BinarySearchTree(val)
+                    break
 
             # same steps as above here the condition we check is value to be inserted > currentNode's value
             else:
-                if self.right:
-                    self.right.insert(val)
+                if node.right is not None:
+                    node = node.right
                 else:
-                    self.right = BinarySearchTree(val)
+                    node.right = BinarySearchTree(val)
+                    break
 
-    def search(self, val):
-        if val == self.val:
-            return True
+        # every node on the path gained one descendant
+        for node in path:
+            node.size += 1
+        # heights grow bottom-up until an ancestor is already tall enough
+        height = 1
+        for node in reversed(path):
+            height += 1
+            if node.height >= height:
+                break
+            node.height = height
 
-        if val < self.val:
-            if self.left is None:
-                return False
-            return self.left.search(val)
-
-        if self.right is None:
+    def search(self, val):
+        if self.val is None:
             return False
-        return self.right.search(val)
+        node = self
+        while node is not None:
+            if val == node.val:
+                return True
+            if val < node.val:
+                node = node.left
+            else:
+                node = node.right
+        return False
 
-    # deleting a node means we have to rearrange some part of the tree
+    # deleting a node only rearranges the links along its search path
     def delete(self, val):
-        # check if the value we want to delete is in the tree
-        if not self.find_node_and_parent(val):
+        if self.val is None:
             return False
-        # we get the node we want to delete and its parent-node from find_node_and_parent method
-        deleting_node, parent_node = self.find_node_and_parent(val)
-        # check how many children nodes does the node we are going to delete have by traverse_pre_order from the deleting_node
-        nodes_effected = deleting_node.traverse_pre_order([])
-        # if len(nodes_effected)==1 means, the node to be deleted doesn't have any children
-        # so we can just check from its parent node the position(left or right) of node we want to delete
-        # and point the position to 'None' i.e node is deleted
-        if len(nodes_effected) == 1:
-            if parent_node.left is not None and parent_node.left.val == deleting_node.val:
-                parent_node.left = None
+        # find the node to delete, remembering the path to it
+        path = []
+        deleting_node = self
+        while deleting_node is not None and val != deleting_node.val:
+            path.append(deleting_node)
+            if val < deleting_node.val:
+                deleting_node = deleting_node.left
             else:
-                parent_node.right = None
+                deleting_node = deleting_node.right
+        # check if the value we want to delete is in the tree
+        if deleting_node is None:
+            return False
+        if deleting_node.count > 1:
+            # drop one copy of a multiset key, the node stays
+            deleting_node.count -= 1
+            deleting_node.size -= 1
+            for node in path:
+                node.size -= 1
             return True
-        # if len(nodes_effected) > 1 which means the node we are going to delete has 'children',
-        # so the tree must be rearranged from the deleting_node
+        parent_node = path[-1] if path else None
+
+        # node with two children: copy the in-order successor (leftmost node of
+        # the right subtree) into it, then splice the successor out instead
+        if deleting_node.left is not None and deleting_node.right is not None:
+            path.append(deleting_node)
+            successor_parent = deleting_node
+            successor = deleting_node.right
+            while successor.left is not None:
+                successor_parent = successor
+                path.append(successor_parent)
+                successor = successor.left
+            deleting_node.val = successor.val
+            deleting_node.count = successor.count
+            # the successor has no left child, so its right subtree takes its place
+            if successor_parent.left is successor:
+                successor_parent.left = successor.right
+            else:
+                successor_parent.right = successor.right
+
+        # zero or one child: the child (or None) replaces the deleted node
         else:
-            # if the node we want to delete doesn't have any parent means the node to be deleted is 'root' node
+            child = deleting_node.left if deleting_node.left is not None else deleting_node.right
             if parent_node is None:
-                nodes_effected.remove(deleting_node.val)
-                # make the 'root' node i.e self value,left,right to None,
-                # this means we need to implement a new tree again without the delted node
-                self.left = None
-                self.right = None
-                self.val = None
-                # construction of new tree
-                for node in nodes_effected:
-                    self.insert(node)
-                return True
-
-            # if the node we want to delete has a parent
-            # traverse from parent_node
-            nodes_effected = parent_node.traverse_pre_order([])
-            # deleting the node
-            if parent_node.left == deleting_node:
-                parent_node.left = None
+                # the root is this object itself, so pull the child's contents up into it
+                if child is None:
+                    self.val = None
+                    self.left = None
+                    self.right = None
+                    self.count = 0
+                    self.size = 0
+                    self.height = 0
+                else:
+                    self.val = child.val
+                    self.left = child.left
+                    self.right = child.right
+                    self.count = child.count
+                    self.size = child.size
+                    self.height = child.height
+            elif parent_node.left is deleting_node:
+                parent_node.left = child
             else:
-                parent_node.right = None
-            # removing the parent_node, deleting_node and inserting the nodes_effected in the tree
-            nodes_effected.remove(deleting_node.val)
-            nodes_effected.remove(parent_node.val)
-            for node in nodes_effected:
-                self.insert(node)
+                parent_node.right = child
 
+        # every node on the path lost one descendant
+        for node in reversed(path):
+            node._update()
         return True
-    
+
+    def search_many(self, keys):
+        '''
+        Look up a batch of keys & return a presence mask in input order,
+        walking the tree once for the whole batch when it is large enough
+        (see tree_utils.search_many).
+        '''
+        root = self if self.val is not None else None
+        return search_many(root, keys, self.search, attrgetter('val'), attrgetter('left'), attrgetter('right'), self.size)
+
+    def __iter__(self):
+        '''
+        Yield the keys in ascending order, lazily, holding at most one stack
+        entry per level of the tree. Multiset keys are yielded once per copy.
+        '''
+        root = self if self.val is not None else None
+        return iter_keys(root,
+                         attrgetter('val'), attrgetter('left'), attrgetter('right'), attrgetter('count'))
+
+    def __reversed__(self):
+        '''
+        Yield the keys in descending order, lazily.
+        '''
+        root = self if self.val is not None else None
+        return reverse_keys(root,
+                            attrgetter('val'), attrgetter('left'), attrgetter('right'), attrgetter('count'))
+
+    def items_between(self, lo, hi):
+        '''
+        Yield the keys with lo <= key <= hi in ascending order in O(h + k)
+        for k keys in the range. Subtrees entirely below lo are skipped.
+        '''
+        root = self if self.val is not None else None
+        return keys_between(root, lo, hi,
+                            attrgetter('val'), attrgetter('left'), attrgetter('right'), attrgetter('count'))
+
+    @classmethod
+    def from_sorted(cls, values, multiset: bool = False):
+        '''
+        Build a height-balanced tree from values in ascending order in O(n).
+        Repeated values are skipped since the BST holds no duplicates, or
+        counted on their node in multiset mode.
+        '''
+        tree = cls(multiset=multiset)
+        tree._build_balanced(values)
+        return tree
+
+    def bulk_load(self, values):
+        '''
+        Load values (in any order) into the tree & rebalance it. The existing
+        keys are merged with the sorted new ones and the tree is rebuilt from
+        the merged run, so the cost is one sort plus a linear rebuild.
+        '''
+        new_values = sorted(values)
+        if self.val is not None:
+            new_values = heapq.merge(self.traverse_in_order([]), new_values)
+        self._build_balanced(new_values)
+
+    def _build_balanced(self, values):
+        # the middle value becomes the root of every (sub)range, this node is the overall root
+        # repeats are dropped, or kept as the count of their node in multiset mode
+        values, counts = run_lengths(check_sorted(values))
+        if not self.multiset:
+            counts = None
+        self.left = None
+        self.right = None
+        if not values:
+            self.val = None
+            self.count = 0
+            self.size = 0
+            self.height = 0
+            return
+        mid = len(values) // 2
+        self.val = values[mid]
+        self.count = counts[mid] if counts else 1
+        self.left = _build_subtree(values, 0, mid - 1, counts)
+        self.right = _build_subtree(values, mid + 1, len(values) - 1, counts)
+        self._update()
+
+    def clone(self):
+        '''
+        Return a copy of the tree with the same shape, keys & size/height
+        fields, copied node for node in O(n): no key comparisons & no
+        rebalancing, so it is far cheaper than inserting the keys again.
+        '''
+        copy = type(self)(multiset=self.multiset)
+        stack = [(self, copy)]
+        while stack:
+            node, node_copy = stack.pop()
+            node_copy.val = node.val
+            node_copy.count = node.count
+            node_copy.size = node.size
+            node_copy.height = node.height
+            if node.left is not None:
+                node_copy.left = BinarySearchTree()
+                stack.append((node.left, node_copy.left))
+            if node.right is not None:
+                node_copy.right = BinarySearchTree()
+                stack.append((node.right, node_copy.right))
+        return copy
+
     def tree_height(self):
-        start = datetime.now()
-        if self.val is None:
-            end = datetime.now()
-            return (0, end - start)
-        
-        left_height = self.left.tree_height()[0] if self.left else 0
-        right_height = self.right.tree_height()[0] if self.right else 0
-        
-        height = max(left_height, right_height) + 1
-        end = datetime.now()
-        return (height, end - start)
+        # height is maintained on every insert & delete, so this is O(1)
+        with Timer() as timer:
+            height = self.height
+        return (height, timer.elapsed)
 
 
-def bst_insert(bst: BinarySearchTree):
-    insert_values = read_data_files('insert')
-    
-    # execution times for insertion of each file
-    exec_times = []
-    
-    # execution times for tree_height
-    # this should not be returned for coder runner activity
-    tree_heights = []
-    
+class MultisetBinarySearchTree(BinarySearchTree):
+    # the root of a BinarySearchTree(multiset=True)
+    __slots__ = ()
+    multiset = True
+
+
+def _build_subtree(values, lo, hi, counts=None):
+    # recursion depth is only log2(n) since each call halves the range
+    if lo > hi:
+        return None
+    mid = (lo + hi) // 2
+    node = BinarySearchTree(values[mid])
+    if counts:
+        node.count = counts[mid]
+    node.left = _build_subtree(values, lo, mid - 1, counts)
+    node.right = _build_subtree(values, mid + 1, hi, counts)
+    node._update()
+    return node
+
+def bst_insert(bst: BinarySearchTree, disable_gc: bool = False, stream: bool = False):
     # insert values from each file into the tree
-    for values in insert_values.values():
-        start = datetime.now()
-        
-        # insert each value from file to the tree
-        for value in values:
-            bst.insert(value)
-            
-        end = datetime.now()
-        # add execution time for each file
-        exec_times.append(end - start)
+    insert_values = read_op_files('insert', stream=stream)
+    return run_op(bst, 'insert', insert_values, disable_gc)
         
-        # add tree_heights for each file
-        tree_heights.append(bst.tree_height()[0])
-        
-    # return only exec_times for code runner
-    # return exec_times
-    return (exec_times, tree_heights)
-        
-def bst_search(bst: BinarySearchTree):
+def bst_search(bst: BinarySearchTree, disable_gc: bool = False, stream: bool = False):
     # initialize the empty tree first
-    bst_insert(bst)
-    
-    search_values = read_data_files('search')
-    
-    # execution times for search of each file
-    exec_times = []
-    
-    # execution times for tree_height
-    # this should not be returned for coder runner activity
-    tree_heights = []
+    bst_insert(bst, disable_gc, stream)
     
     # search values of each file from the tree
-    for values in search_values.values():
-        start = datetime.now()
-        
-        # search each value of file from the tree
-        for value in values:
-            bst.search(value)
-            
-        end = datetime.now()
-        # add execution time for each file
-        exec_times.append(end - start)
-        
-        # add tree_heights for each file
-        tree_heights.append(bst.tree_height()[0])
-        
-    # return only exec_times for code runner
-    # return exec_times
-    return (exec_times, tree_heights)
+    search_values = read_op_files('search', stream=stream)
+    return run_op(bst, 'search', search_values, disable_gc)
 
-def bst_delete(bst: BinarySearchTree):
+def bst_delete(bst: BinarySearchTree, disable_gc: bool = False, stream: bool = False):
     # initialize the empty tree first
-    bst_insert(bst)
-    
-    delete_values = read_data_files('delete')
-    
-    # execution times for deletion of each file
-    exec_times = []
-    
-    # execution times for tree_height
-    # this should not be returned for coder runner activity
-    tree_heights = []
+    bst_insert(bst, disable_gc, stream)
     
     # delete values of each file from the tree
-    for values in delete_values.values():
-        start = datetime.now()
-        
-        # delete each value of file from the tree
-        for value in values:
-            bst.delete(value)
-            
-        end = datetime.now()
-        # add execution time for each file
-        exec_times.append(end - start)
-        
-        # add tree_heights for each file
-        tree_heights.append(bst.tree_height()[0])
-        
-    # return only exec_times for code runner
-    # return exec_times
-    return (exec_times, tree_heights)
+    delete_values = read_op_files('delete', stream=stream)
+    return run_op(bst, 'delete', delete_values, disable_gc)
     
-def avg_exec_time_insert(iterations: int = 3):
-    '''
-    Execute the tree operation for the specified no of iterations
-    & write the execution times in csv. Finally calculate average
-    execution time & write back.
-    '''
+def avg_exec_time_insert(iterations: int = 3, warmup: int = 0, disable_gc: bool = False):
+    # write the exec times of `iterations` insert runs (after `warmup` unrecorded ones) to csv & average them
     print('Averaging BST insert..')
-    remove_file('bst', 'insert')
-    lines_to_write = []
-    
-    for i in range(iterations):
-        # re-initialize tree each time
-        bst = BinarySearchTree()
-        exec_times = bst_insert(bst)
-        
-        # write each execution time one by one
-        lines_to_write = get_lines_to_write(i, exec_times, 'bst')
-        
-        print(lines_to_write)
-        
-        for line in lines_to_write:
-            write_to_file(line, 'bst', 'insert')
-    
-    compute_avg('bst', 'insert')
-    
-def avg_exec_time_search(iterations: int = 3):
-    '''
-    Execute the tree operation for the specified no of iterations
-    & write the execution times in csv. Finally calculate average
-    execution time & write back.
-    '''
+    average_exec_times(BinarySearchTree, 'bst', 'insert', iterations, warmup, disable_gc)
+
+def avg_exec_time_search(iterations: int = 3, warmup: int = 0, disable_gc: bool = False):
+    # write the exec times of `iterations` search runs (after `warmup` unrecorded ones) to csv & average them
     print('Averaging BST search..')
-    remove_file('bst', 'search')
-    lines_to_write = []
-    for i in range(iterations):
-        # re-initialize tree each time
-        bst = BinarySearchTree()
-        # ignore insertion for this
-        bst_insert(bst)
-        exec_times = bst_search(bst)
-        
-        # write each execution time one by one
-        lines_to_write = get_lines_to_write(i, exec_times, 'bst')
-        
-        for line in lines_to_write:
-            write_to_file(line, 'bst', 'search')
-    
-    compute_avg('bst', 'search')
-    
-def avg_exec_time_delete(iterations: int = 3):
-    '''
-    Execute the tree operation for the specified no of iterations
-    & write the execution times in csv. Finally calculate average
-    execution time & write back.
-    '''
+    average_exec_times(BinarySearchTree, 'bst', 'search', iterations, warmup, disable_gc)
+
+def avg_exec_time_delete(iterations: int = 3, warmup: int = 0, disable_gc: bool = False):
+    # write the exec times of `iterations` delete runs (after `warmup` unrecorded ones) to csv & average them
     print('Averaging BST delete..')
-    remove_file('bst', 'delete')
-    lines_to_write = []
-    for i in range(iterations):
-        # re-initialize tree each time
-        bst = BinarySearchTree()
-        # ignore insertion for this
-        bst_insert(bst)
-        exec_times = bst_delete(bst)
-        
-        # write each execution time one by one
-        lines_to_write = get_lines_to_write(i, exec_times, 'bst')
-        
-        for line in lines_to_write:
-            write_to_file(line, 'bst', 'delete')
-    
-    compute_avg('bst', 'delete')
-    
+    average_exec_times(BinarySearchTree, 'bst', 'delete', iterations, warmup, disable_gc)
+
 if __name__ == '__main__':
     # initialize the tree
     # bst = BinarySearchTree()
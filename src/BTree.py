@@ -0,0 +1,299 @@
+from bisect import bisect_left, bisect_right
+from harness import average_exec_times, read_op_files, run_op
+from timing import Timer
+
+
+# a node of the B+-tree: a leaf when children is None
+class Node:
+    __slots__ = ('keys', 'children', 'counts', 'next')
+
+    def __init__(self, keys=None, children=None, counts=None):
+        self.keys = keys if keys is not None else []  # sorted keys / separators
+        self.children = children  # child nodes of an internal node, len(keys) + 1 of them
+        self.counts = counts  # copies of each key of a leaf, only in multiset mode
+        self.next = None  # the leaf to the right, so leaves can be walked in order
+
+
+# B+-tree
+class BTree:
+    '''
+    B+-tree: every key lives in a leaf, in a sorted Python list searched with
+    bisect, and the internal nodes only hold separators routing a search to
+    one of their children. `order` is the fanout: a leaf holds up to `order`
+    keys & an internal node up to `order` children, and every node but the
+    root is kept at least half full, so the height is about log(n) / log(order / 2)
+    instead of the ~log2(n) of a binary tree, with one node object per
+    `order` keys rather than per key. All keys of children[i + 1] are >= keys[i]
+    & all keys of children[i] < keys[i]; leaves are linked left to right.
+    Like the BST, duplicate keys are rejected unless multiset=True, where a
+    leaf keeps a `counts` list next to its keys.
+    '''
+
+    def __init__(self, order: int = 64, multiset: bool = False):
+        if order < 3:
+            raise ValueError(f'order must be at least 3, got {order}')
+        self.order = order
+        self.multiset = multiset
+        self.root = Node(counts=[] if multiset else None)
+        self.size = 0  # no of keys, counting every copy in multiset mode
+        self.height = 1  # levels of nodes, the root leaf included
+
+    def __len__(self):
+        return self.size
+
+    # the leaf key could be in, walking down from the root
+    def _find_leaf(self, key):
+        node = self.root
+        while node.children is not None:
+            node = node.children[bisect_right(node.keys, key)]
+        return node
+
+    def search(self, key):
+        keys = self._find_leaf(key).keys
+        i = bisect_left(keys, key)
+        return i < len(keys) and keys[i] == key
+
+    def insert(self, key):
+        # walk down to the leaf, remembering the nodes & child indices passed
+        path = []
+        node = self.root
+        while node.children is not None:
+            i = bisect_right(node.keys, key)
+            path.append((node, i))
+            node = node.children[i]
+
+        keys = node.keys
+        i = bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            if not self.multiset:
+                return 'No duplicates allowed in BTree'
+            # one more copy, the leaf keeps its shape
+            node.counts[i] += 1
+            self.size += 1
+            return
+        keys.insert(i, key)
+        if node.counts is not None:
+            node.counts.insert(i, 1)
+        self.size += 1
+
+        # split full nodes bottom-up, each split passing a separator & the new
+        # right node on to the parent
+        if len(keys) <= self.order:
+            return
+        separator, right = self._split_leaf(node)
+        while path:
+            parent, i = path.pop()
+            parent.keys.insert(i, separator)
+            parent.children.insert(i + 1, right)
+            if len(parent.children) <= self.order:
+                return
+            separator, right = self._split_internal(parent)
+
+        # the root split, the tree grows one level at the top
+        self.root = Node([separator], [self.root, right])
+        self.height += 1
+
+    # move the upper half of a full leaf to a new leaf to its right
+    def _split_leaf(self, node):
+        mid = len(node.keys) // 2
+        right = Node(node.keys[mid:])
+        del node.keys[mid:]
+        if node.counts is not None:
+            right.counts = node.counts[mid:]
+            del node.counts[mid:]
+        right.next = node.next
+        node.next = right
+        return right.keys[0], right
+
+    # move the upper half of a full internal node to a new node to its right,
+    # the middle separator going up
+    def _split_internal(self, node):
+        mid = len(node.keys) // 2
+        separator = node.keys[mid]
+        right = Node(node.keys[mid + 1:], node.children[mid + 1:])
+        del node.keys[mid:]
+        del node.children[mid + 1:]
+        return separator, right
+
+    def delete(self, key):
+        path = []
+        node = self.root
+        while node.children is not None:
+            i = bisect_right(node.keys, key)
+            path.append((node, i))
+            node = node.children[i]
+
+        keys = node.keys
+        i = bisect_left(keys, key)
+        if i == len(keys) or keys[i] != key:
+            return False
+        self.size -= 1
+        if node.counts is not None:
+            if node.counts[i] > 1:
+                # drop one copy of a multiset key, the key stays
+                node.counts[i] -= 1
+                return True
+            del node.counts[i]
+        del keys[i]
+
+        # separators equal to the deleted key stay valid bounds, so only nodes
+        # falling below half full need fixing, bottom-up
+        min_keys = self.order // 2
+        while path and len(node.keys) < min_keys:
+            parent, i = path.pop()
+            self._rebalance(parent, i)
+            node = parent
+            # internal nodes need (order + 1) // 2 children, one key less
+            min_keys = (self.order + 1) // 2 - 1
+
+        # an internal root left with a single child is dropped
+        if self.root.children is not None and len(self.root.children) == 1:
+            self.root = self.root.children[0]
+            self.height -= 1
+        return True
+
+    def _rebalance(self, parent, i):
+        '''
+        Refill children[i] of parent, just fallen below half full, by taking
+        a key from a sibling with keys to spare, or else by merging it with
+        a sibling, which takes a separator out of parent.
+        '''
+        children = parent.children
+        node = children[i]
+        leaf = node.children is None
+        min_keys = self.order // 2 if leaf else (self.order + 1) // 2 - 1
+        if i > 0 and len(children[i - 1].keys) > min_keys:
+            left = children[i - 1]
+            if leaf:
+                node.keys.insert(0, left.keys.pop())
+                if node.counts is not None:
+                    node.counts.insert(0, left.counts.pop())
+                parent.keys[i - 1] = node.keys[0]
+            else:
+                # rotate through the separator
+                node.keys.insert(0, parent.keys[i - 1])
+                parent.keys[i - 1] = left.keys.pop()
+                node.children.insert(0, left.children.pop())
+        elif i + 1 < len(children) and len(children[i + 1].keys) > min_keys:
+            right = children[i + 1]
+            if leaf:
+                node.keys.append(right.keys.pop(0))
+                if node.counts is not None:
+                    node.counts.append(right.counts.pop(0))
+                parent.keys[i] = right.keys[0]
+            else:
+                node.keys.append(parent.keys[i])
+                parent.keys[i] = right.keys.pop(0)
+                node.children.append(right.children.pop(0))
+        else:
+            # merge the pair children[i], children[i + 1] into the left one
+            if i == len(children) - 1:
+                i -= 1
+            left, right = children[i], children[i + 1]
+            if leaf:
+                left.keys += right.keys
+                if left.counts is not None:
+                    left.counts += right.counts
+                left.next = right.next
+            else:
+                left.keys.append(parent.keys[i])
+                left.keys += right.keys
+                left.children += right.children
+            del parent.keys[i]
+            del children[i + 1]
+
+    # iterate the keys in ascending order along the leaf links
+    def __iter__(self):
+        node = self.root
+        while node.children is not None:
+            node = node.children[0]
+        while node is not None:
+            if node.counts is None:
+                yield from node.keys
+            else:
+                for key, count in zip(node.keys, node.counts):
+                    # every copy of a multiset key
+                    for _ in range(count):
+                        yield key
+            node = node.next
+
+    def clone(self):
+        '''
+        Return a copy of the tree with the same nodes, copied level by level
+        in O(n / order) list copies, with no key comparisons.
+        '''
+        copy = type(self)(self.order, self.multiset)
+        copy.size = self.size
+        copy.height = self.height
+        copy.root = Node(self.root.keys[:], self.root.children,
+                         self.root.counts[:] if self.root.counts is not None else None)
+        level = [copy.root]
+        while level[0].children is not None:
+            next_level = []
+            for node in level:
+                # node still points at the original children, copy them over
+                node.children = [Node(child.keys[:], child.children,
+                                      child.counts[:] if child.counts is not None else None)
+                                 for child in node.children]
+                next_level += node.children
+            level = next_level
+        # relink the copied leaves, which come out in key order
+        for leaf, next_leaf in zip(level, level[1:]):
+            leaf.next = next_leaf
+        return copy
+
+    def tree_height(self):
+        # height is maintained on every root split & collapse, so this is O(1)
+        with Timer() as timer:
+            height = self.height if self.size else 0
+        return (height, timer.elapsed)
+
+
+def btree_insert(btree: BTree, disable_gc: bool = False, stream: bool = False):
+    # insert values from each file into the tree
+    insert_values = read_op_files('insert', stream=stream)
+    return run_op(btree, 'insert', insert_values, disable_gc)
+
+def btree_search(btree: BTree, disable_gc: bool = False, stream: bool = False):
+    # initialize the empty tree first
+    btree_insert(btree, disable_gc, stream)
+
+    # search values of each file from the tree
+    search_values = read_op_files('search', stream=stream)
+    return run_op(btree, 'search', search_values, disable_gc)
+
+def btree_delete(btree: BTree, disable_gc: bool = False, stream: bool = False):
+    # initialize the empty tree first
+    btree_insert(btree, disable_gc, stream)
+
+    # delete values of each file from the tree
+    delete_values = read_op_files('delete', stream=stream)
+    return run_op(btree, 'delete', delete_values, disable_gc)
+
+def avg_exec_time_insert(iterations: int = 3, warmup: int = 0, disable_gc: bool = False):
+    # write the exec times of `iterations` insert runs (after `warmup` unrecorded ones) to csv & average them
+    print('Averaging BTree insert..')
+    average_exec_times(BTree, 'btree', 'insert', iterations, warmup, disable_gc)
+
+def avg_exec_time_search(iterations: int = 3, warmup: int = 0, disable_gc: bool = False):
+    # write the exec times of `iterations` search runs (after `warmup` unrecorded ones) to csv & average them
+    print('Averaging BTree search..')
+    average_exec_times(BTree, 'btree', 'search', iterations, warmup, disable_gc)
+
+def avg_exec_time_delete(iterations: int = 3, warmup: int = 0, disable_gc: bool = False):
+    # write the exec times of `iterations` delete runs (after `warmup` unrecorded ones) to csv & average them
+    print('Averaging BTree delete..')
+    average_exec_times(BTree, 'btree', 'delete', iterations, warmup, disable_gc)
+
+if __name__ == '__main__':
+    # initialize the tree
+    # btree = BTree()
+
+    # print(btree_insert(btree))
+    # print(btree.tree_height())
+    # print(btree_search(btree))
+    # print(btree_delete(btree))
+
+    avg_exec_time_insert()
+    avg_exec_time_search()
+    avg_exec_time_delete()
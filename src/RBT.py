@@ -1,28 +1,69 @@
+import heapq
 import sys
-from datetime import datetime
-from file_utils import read_data_files, write_to_file, compute_avg, get_lines_to_write, remove_file
+from operator import attrgetter
+from harness import average_exec_times, read_op_files, run_op
+from timing import Timer
+from tree_utils import check_sorted, iter_keys, keys_between, reverse_keys, run_lengths, search_many
 
 sys.setrecursionlimit(30000)
 
 
 # Data structure that represents a node in the tree
 class Node:
+    __slots__ = ('data', 'parent', 'left', 'right', 'color', 'size', 'height', 'count')
+
     def __init__(self, data):
         self.data = data  # holds the key
         self.parent = None  # pointer to the parent
         self.left = None  # pointer to left child
         self.right = None  # pointer to right child
         self.color = 1  # 1 -> Red, 0 -> Black
+        self.size = 1  # no of keys in the subtree rooted here
+        self.height = 1  # height of the subtree rooted here
+        self.count = 1  # copies of the key, above 1 only in multiset mode
+
+
+# the black leaf sentinel, shared by every tree so that subtrees can move
+# between trees (split, join & union) without relinking their leaves.
+# Its parent is scratch state: rb_transplant & fix_delete point it into the
+# tree being deleted from, & _remove_node resets it to None when done. Left
+# set, the module global would keep the last tree that deleted anything
+# alive after every other reference to it is gone, & tie otherwise
+# independent trees together through their shared leaf
+_NULL = Node(0)
+_NULL.color = 0
+_NULL.size = 0
+_NULL.height = 0
+_NULL.count = 0
 
 
 # class RedBlackTree implements the operations in Red Black Tree
 class RedBlackTree:
-    def __init__(self):
-        self.NULL = Node(0)
-        self.NULL.color = 0
-        self.NULL.left = None
-        self.NULL.right = None
+    # with multiset=True a duplicate insert bumps the count of the key's node
+    # instead of adding a node, & delete drops one copy at a time
+    def __init__(self, multiset: bool = False):
+        self.NULL = _NULL
         self.root = self.NULL
+        self.multiset = multiset
+
+    def __len__(self):
+        return self.root.size
+
+    @property
+    def height(self):
+        return self.root.height
+
+    # recompute the size & height of node from its children
+    def _update(self, node):
+        left, right = node.left, node.right
+        node.size = left.size + right.size + node.count
+        node.height = (left.height if left.height > right.height else right.height) + 1
+
+    # recompute size & height from node up to the root
+    def _update_path(self, node):
+        while node is not None and node != self.NULL:
+            self._update(node)
+            node = node.parent
 
     # find the node with the minimum key
     def minimum(self, node):
@@ -52,6 +93,9 @@ class RedBlackTree:
             x.parent.right = y
         y.left = x
         x.parent = y
+        # x is now below y, so refresh x first
+        self._update(x)
+        self._update(y)
 
     # rotate right at node x
     def right_rotate(self, x):
@@ -69,6 +113,9 @@ class RedBlackTree:
             x.parent.left = y
         y.right = x
         x.parent = y
+        # x is now below y, so refresh x first
+        self._update(x)
+        self._update(y)
 
     def rb_transplant(self, u, v):
         if u.parent is None:
@@ -153,6 +200,17 @@ class RedBlackTree:
         if z == self.NULL:
             return False
 
+        if z.count > 1:
+            # drop one copy of a multiset key, the node stays
+            z.count -= 1
+            self._update_path(z)
+            return True
+
+        self._remove_node(z)
+        return True
+
+    # unlink node z from the tree & rebalance
+    def _remove_node(self, z):
         y = z
         y_original_color = y.color
         if z.left == self.NULL:
@@ -176,10 +234,15 @@ class RedBlackTree:
             y.left = z.left
             y.left.parent = y
             y.color = z.color
+
+        # the subtree sizes shrink from where x now hangs up to the root
+        x_parent = x.parent
+        self._update_path(x_parent)
         if y_original_color == 0:
             self.fix_delete(x)
-
-        return True
+            # rotations keep sizes but can change heights above them
+            self._update_path(x_parent)
+        self.NULL.parent = None
 
     # fix the red-black tree
     def fix_insert(self, k):
@@ -221,25 +284,28 @@ class RedBlackTree:
                     self.right_rotate(k.parent.parent)
             if k == self.root:
                 break
+        # a red root (left by case 3.1) turned black adds one to every black height
+        grew = self.root.color == 1
         self.root.color = 0
+        return grew
 
     def pre_order_helper(self, node):
         if node != self.NULL:
-            print(node.data + " ", end='')
+            print(node.data, end=" ")
             self.pre_order_helper(node.left)
             self.pre_order_helper(node.right)
 
     def in_order_helper(self, node):
         if node != self.NULL:
             self.in_order_helper(node.left)
-            print(node.data + " ", end='')
+            print(node.data, end=" ")
             self.in_order_helper(node.right)
 
     def post_order_helper(self, node):
         if node != self.NULL:
             self.post_order_helper(node.left)
             self.post_order_helper(node.right)
-            print(node.data + " ", end='')
+            print(node.data, end=" ")
 
     def search_tree_helper(self, node, key):
         if node == self.NULL or key == node.data:
@@ -253,23 +319,27 @@ class RedBlackTree:
     # and fix the tree
     def insert(self, key):
         # Ordinary Binary Search Insertion
-        node = Node(key)
-        node.parent = None
-        node.data = key
-        node.left = self.NULL
-        node.right = self.NULL
-        node.color = 1  # new node must be red
-
         y = None
         x = self.root
+        multiset = self.multiset
 
         while x != self.NULL:
+            if multiset and key == x.data:
+                # one more copy: no new node, only the sizes up from x grow
+                x.count += 1
+                self._update_path(x)
+                return
             y = x
-            if node.data < x.data:
+            if key < x.data:
                 x = x.left
             else:
                 x = x.right
 
+        node = Node(key)
+        node.left = self.NULL
+        node.right = self.NULL
+        node.color = 1  # new node must be red
+
         # y is parent of x
         node.parent = y
         if y is None:
@@ -286,10 +356,15 @@ class RedBlackTree:
 
         # if the grandparent is None, simply return
         if node.parent.parent is None:
+            self._update_path(y)
             return
 
         # Fix the tree
         self.fix_insert(node)
+        # every node whose size or height went stale (the path the node was
+        # added on, as reshaped by the rotations) is now an ancestor of it, so
+        # one bottom-up pass refreshes them all
+        self._update_path(node.parent)
 
     # search the tree for the key k
     # and return the corresponding node
@@ -300,186 +375,398 @@ class RedBlackTree:
     def delete(self, data):
         return self.delete_node_helper(self.root, data)
 
-    def tree_height(self):
-        return self._height_helper(self.root)
+    def search_many(self, keys):
+        '''
+        Look up a batch of keys & return a presence mask in input order,
+        walking the tree once for the whole batch when it is large enough
+        (see tree_utils.search_many).
+        '''
+        NULL = self.NULL
+        return search_many(self.root, keys, lambda key: self.search(key) is not NULL,
+                           attrgetter('data'), attrgetter('left'), attrgetter('right'), len(self), NULL)
+
+    def __iter__(self):
+        '''
+        Yield the keys in ascending order, lazily, holding at most one stack
+        entry per level of the tree. Multiset keys are yielded once per copy.
+        '''
+        return iter_keys(self.root,
+                         attrgetter('data'), attrgetter('left'), attrgetter('right'), attrgetter('count'), self.NULL)
+
+    def __reversed__(self):
+        '''
+        Yield the keys in descending order, lazily.
+        '''
+        return reverse_keys(self.root,
+                            attrgetter('data'), attrgetter('left'), attrgetter('right'), attrgetter('count'), self.NULL)
+
+    def items_between(self, lo, hi):
+        '''
+        Yield the keys with lo <= key <= hi in ascending order in O(h + k)
+        for k keys in the range. Subtrees entirely below lo are skipped.
+        '''
+        return keys_between(self.root, lo, hi,
+                            attrgetter('data'), attrgetter('left'), attrgetter('right'), attrgetter('count'), self.NULL)
+
+    # count the keys < key (or <= key when inclusive) in O(log n) using subtree sizes
+    def _count_below(self, key, inclusive=False):
+        count = 0
+        node = self.root
+        while node != self.NULL:
+            if key < node.data or (not inclusive and key == node.data):
+                node = node.left
+            else:
+                count += node.left.size + node.count
+                node = node.right
+        return count
+
+    def rank(self, key):
+        '''
+        Return the no of keys in the tree that are < key.
+        '''
+        return self._count_below(key)
+
+    def select(self, k):
+        '''
+        Return the k-th smallest key, counting from 0, so that
+        select(rank(key)) == key for any key in the tree.
+        '''
+        if k < 0 or k >= self.root.size:
+            raise IndexError('select index out of range')
+        node = self.root
+        while True:
+            left_size = node.left.size
+            if k < left_size:
+                node = node.left
+            elif k < left_size + node.count:
+                return node.data
+            else:
+                k -= left_size + node.count
+                node = node.right
 
-    def _height_helper(self, node):
-        start = datetime.now()
-        if node == self.NULL:
-            end = datetime.now()
-            return (0, end - start)
-        
-        left_height = self._height_helper(node.left)[0]
-        right_height = self._height_helper(node.right)[0]
-        
-        height = max(left_height, right_height) + 1
-        end = datetime.now()
-        return (height, end - start)
+    def count_range(self, lo, hi):
+        '''
+        Return the no of keys in the tree with lo <= key <= hi.
+        '''
+        if hi < lo:
+            return 0
+        return self._count_below(hi, inclusive=True) - self._count_below(lo)
+
+    # black height of the subtree at root: the black nodes on a path down to a leaf
+    def _black_height(self, root):
+        height = 0
+        while root != self.NULL:
+            if root.color == 0:
+                height += 1
+            root = root.left
+        return height
+
+    def _join3(self, left, left_height, node, right, right_height):
+        '''
+        Join the subtrees at roots left & right, of the given black heights,
+        with node in between (keys in left <= node's key <= keys in right) &
+        return (new root, its black height). node is hung where the spine of
+        the taller tree reaches the black height of the shorter one, so this
+        takes O(1 + the difference in black heights) plus the fixup & the
+        refresh of the sizes above node.
+        '''
+        NULL = self.NULL
+        # black roots keep the trees valid & the fixup away from the top
+        if left != NULL:
+            if left.color == 1:
+                left.color = 0
+                left_height += 1
+            left.parent = None
+        if right != NULL:
+            if right.color == 1:
+                right.color = 0
+                right_height += 1
+            right.parent = None
+        node.parent = None
+        if left_height == right_height:
+            node.left = left
+            node.right = right
+            node.color = 0
+            if left != NULL:
+                left.parent = node
+            if right != NULL:
+                right.parent = node
+            self._update(node)
+            return node, left_height + 1
+
+        node.color = 1
+        if left_height > right_height:
+            # walk down the right spine of left to the black node (or leaf)
+            # of the same black height as right
+            self.root = left
+            height = left_height
+            parent = None
+            spine = left
+            while spine.color == 1 or height != right_height:
+                if spine.color == 0:
+                    height -= 1
+                parent = spine
+                spine = spine.right
+            parent.right = node
+            node.left = spine
+            node.right = right
+        else:
+            # mirror: down the left spine of right
+            self.root = right
+            height = right_height
+            parent = None
+            spine = right
+            while spine.color == 1 or height != left_height:
+                if spine.color == 0:
+                    height -= 1
+                parent = spine
+                spine = spine.left
+            parent.left = node
+            node.left = left
+            node.right = spine
+        node.parent = parent
+        if node.left != NULL:
+            node.left.parent = node
+        if node.right != NULL:
+            node.right.parent = node
+
+        # the sizes grow from node up, then a red parent is fixed up as on insert
+        height = max(left_height, right_height)
+        self._update(node)
+        self._update_path(parent)
+        if parent.color == 1:
+            if self.fix_insert(node):
+                height += 1
+            # rotations keep sizes but can change heights above them
+            self._update_path(node.parent)
+        return self.root, height
+
+    def _split(self, root, height, key):
+        '''
+        Split the subtree at root, of black height height, into
+        (keys < key, keys >= key) by joining the pieces hanging off the
+        search path for key, & return them as (root, black height) pairs
+        (left, left height, node, right, right height). node is None, except
+        in multiset mode where the node holding key is returned on its own
+        instead of with the keys >= key.
+        '''
+        NULL = self.NULL
+        if root == NULL:
+            return NULL, 0, None, NULL, 0
+        left, right = root.left, root.right
+        # black height of the children
+        height -= root.color == 0
+        if self.multiset and key == root.data:
+            return left, height, root, right, height
+        if key <= root.data:
+            lower, lower_height, equal, upper, upper_height = self._split(left, height, key)
+            upper, upper_height = self._join3(upper, upper_height, root, right, height)
+            return lower, lower_height, equal, upper, upper_height
+        lower, lower_height, equal, upper, upper_height = self._split(right, height, key)
+        lower, lower_height = self._join3(left, height, root, lower, lower_height)
+        return lower, lower_height, equal, upper, upper_height
+
+    def _union(self, a, a_height, b, b_height):
+        # union of the subtrees at roots a & b (of the given black heights):
+        # split a around b's root key & join that key between the unions of
+        # the halves; returns (root, black height)
+        NULL = self.NULL
+        if a == NULL:
+            return b, b_height
+        if b == NULL:
+            return a, a_height
+        left, right = b.left, b.right
+        child_height = b_height - (b.color == 0)
+        lower, lower_height, equal, upper, upper_height = self._split(a, a_height, b.data)
+        if equal is not None:
+            # the key is in both multisets, keep one node with both counts
+            b.count += equal.count
+        lower, lower_height = self._union(lower, lower_height, left, child_height)
+        upper, upper_height = self._union(upper, upper_height, right, child_height)
+        return self._join3(lower, lower_height, b, upper, upper_height)
+
+    # a tree of the same mode rooted at root
+    def _tree_from_root(self, root):
+        tree = type(self)(self.multiset)
+        if root != self.NULL:
+            root.parent = None
+            root.color = 0
+        tree.root = root
+        return tree
+
+    def split(self, key):
+        '''
+        Split the tree into two trees (left, right), left holding the keys
+        < key & right the keys >= key, in O(log n): the subtrees hanging off
+        the search path for key are joined by black height. This tree is
+        left empty.
+        '''
+        left, _, equal, right, right_height = self._split(self.root, self._black_height(self.root), key)
+        if equal is not None:
+            right, _ = self._join3(self.NULL, 0, equal, right, right_height)
+        self.root = self.NULL
+        return self._tree_from_root(left), self._tree_from_root(right)
+
+    def join(self, other):
+        '''
+        Move every key of other, a RedBlackTree whose keys are all >= the
+        keys of this tree (> in multiset mode), into this tree in O(log n):
+        the maximum of this tree is unlinked & joined between the two by
+        black height. other is left empty. Raises ValueError when the key
+        ranges overlap.
+        '''
+        NULL = self.NULL
+        if other.root == NULL:
+            return
+        if self.root == NULL:
+            self.root, other.root = other.root, NULL
+            return
+        last = self.maximum(self.root)
+        first = other.minimum(other.root)
+        if last.data > first.data or (self.multiset and last.data == first.data):
+            raise ValueError('Keys of the joined tree must come after the keys of this tree')
+        self._remove_node(last)
+        root, _ = self._join3(self.root, self._black_height(self.root), last,
+                              other.root, self._black_height(other.root))
+        other.root = NULL
+        root.color = 0
+        self.root = root
+
+    def union(self, other):
+        '''
+        Move every key of other, a RedBlackTree with keys in any range, into
+        this tree in O(m log(n/m + 1)) for m <= n keys in the smaller tree,
+        by recursive split & join instead of m inserts. In multiset mode the
+        counts of keys in both trees are added up. other is left empty.
+        '''
+        root, _ = self._union(self.root, self._black_height(self.root),
+                              other.root, self._black_height(other.root))
+        other.root = self.NULL
+        if root != self.NULL:
+            root.parent = None
+            root.color = 0
+        self.root = root
+
+    @classmethod
+    def from_sorted(cls, values, multiset: bool = False):
+        '''
+        Build a balanced red-black tree from values in ascending order in O(n).
+        Every level is black except a partially filled bottom level, which is
+        red, so all root-to-leaf paths share the same black height.
+        In multiset mode repeated values become the count of one node.
+        '''
+        tree = cls(multiset)
+        tree._build_balanced(check_sorted(values))
+        return tree
+
+    def bulk_load(self, values):
+        '''
+        Load values (in any order) into the tree by merging them with the
+        existing keys & rebuilding, instead of one fixup per inserted key.
+        '''
+        new_values = sorted(values)
+        if self.root != self.NULL:
+            new_values = heapq.merge(self, new_values)
+        self._build_balanced(check_sorted(new_values))
+
+    def _build_balanced(self, values):
+        counts = None
+        if self.multiset:
+            values, counts = run_lengths(values)
+        # the bottom level index of a minimum-height tree holding len(values) keys
+        red_depth = len(values).bit_length() - 1
+        self.root = self._build_subtree(values, 0, len(values) - 1, None, 0, red_depth, counts)
+
+    def _build_subtree(self, values, lo, hi, parent, depth, red_depth, counts=None):
+        if lo > hi:
+            return self.NULL
+        mid = (lo + hi) // 2
+        node = Node(values[mid])
+        node.parent = parent
+        node.color = 1 if depth == red_depth and depth > 0 else 0
+        if counts:
+            node.count = counts[mid]
+        node.left = self._build_subtree(values, lo, mid - 1, node, depth + 1, red_depth, counts)
+        node.right = self._build_subtree(values, mid + 1, hi, node, depth + 1, red_depth, counts)
+        self._update(node)
+        return node
 
+    def clone(self):
+        '''
+        Return a copy of the tree with the same shape, keys, colors &
+        size/height fields, copied node for node in O(n): no key comparisons
+        & no fixups. The leaves of the copy point to the NULL sentinel shared
+        by every tree.
+        '''
+        copy = type(self)(self.multiset)
+        NULL = self.NULL
+        if self.root is NULL:
+            return copy
+        copy.root = Node(self.root.data)
+        stack = [(self.root, copy.root)]
+        while stack:
+            node, node_copy = stack.pop()
+            node_copy.color = node.color
+            node_copy.count = node.count
+            node_copy.size = node.size
+            node_copy.height = node.height
+            node_copy.left = NULL
+            node_copy.right = NULL
+            if node.left is not NULL:
+                child = Node(node.left.data)
+                child.parent = node_copy
+                node_copy.left = child
+                stack.append((node.left, child))
+            if node.right is not NULL:
+                child = Node(node.right.data)
+                child.parent = node_copy
+                node_copy.right = child
+                stack.append((node.right, child))
+        return copy
 
-def rbt_insert(rbt: RedBlackTree):
-    insert_values = read_data_files('insert')
-    
-    # execution times for insertion of each file
-    exec_times = []
-    
-    # execution times for tree_height
-    # this should not be returned for coder runner activity
-    tree_heights = []
-    
+    def tree_height(self):
+        # height is maintained on every insert, delete & rotation, so this is O(1)
+        with Timer() as timer:
+            height = self.root.height
+        return (height, timer.elapsed)
+
+
+def rbt_insert(rbt: RedBlackTree, disable_gc: bool = False, stream: bool = False):
     # insert values from each file into the tree
-    for values in insert_values.values():
-        start = datetime.now()
-        
-        # insert each value from file to the tree
-        for value in values:
-            rbt.insert(value)
-            
-        end = datetime.now()
-        # add execution time for each file
-        exec_times.append(end - start)
-        
-        # add tree_height for each file
-        tree_heights.append(rbt.tree_height()[0])
+    insert_values = read_op_files('insert', stream=stream)
+    return run_op(rbt, 'insert', insert_values, disable_gc)
         
-    # return only exec_times for code runner
-    # return exec_times
-    return (exec_times, tree_heights)
-        
-def rbt_search(rbt: RedBlackTree):
+def rbt_search(rbt: RedBlackTree, disable_gc: bool = False, stream: bool = False):
     # initialize the empty tree first
-    rbt_insert(rbt)
-    
-    search_values = read_data_files('search')
-    
-    # execution times for search of each file
-    exec_times = []
-    
-    # execution times for tree_height
-    # this should not be returned for coder runner activity
-    tree_heights = []
+    rbt_insert(rbt, disable_gc, stream)
     
     # search values of each file from the tree
-    for values in search_values.values():
-        start = datetime.now()
-        
-        # search each value of file from the tree
-        for value in values:
-            rbt.search(value)
-            
-        end = datetime.now()
-        # add execution time for each file
-        exec_times.append(end - start)
-        
-        # add tree_height for each file
-        tree_heights.append(rbt.tree_height()[0])
-        
-    # return only exec_times for code runner
-    # return exec_times
-    return (exec_times, tree_heights)
+    search_values = read_op_files('search', stream=stream)
+    return run_op(rbt, 'search', search_values, disable_gc)
 
-def rbt_delete(rbt: RedBlackTree):
+def rbt_delete(rbt: RedBlackTree, disable_gc: bool = False, stream: bool = False):
     # initialize the empty tree first
-    rbt_insert(rbt)
-    
-    delete_values = read_data_files('delete')
-    
-    # execution times for deletion of each file
-    exec_times = []
-    
-    # execution times for tree_height
-    # this should not be returned for coder runner activity
-    tree_heights = []
+    rbt_insert(rbt, disable_gc, stream)
     
     # delete values of each file from the tree
-    for values in delete_values.values():
-        start = datetime.now()
-        
-        # delete each value of file from the tree
-        for value in values:
-            rbt.delete(value)
-            
-        end = datetime.now()
-        # add execution time for each file
-        exec_times.append(end - start)
-        
-        # add tree_height for each file
-        tree_heights.append(rbt.tree_height()[0])
-        
-    # return only exec_times for code runner
-    # return exec_times
-    return (exec_times, tree_heights)
+    delete_values = read_op_files('delete', stream=stream)
+    return run_op(rbt, 'delete', delete_values, disable_gc)
     
-def avg_exec_time_insert(iterations: int = 3):
-    '''
-    Execute the tree operation for the specified no of iterations
-    & write the execution times in csv. Finally calculate average
-    execution time & write back.
-    '''
+def avg_exec_time_insert(iterations: int = 3, warmup: int = 0, disable_gc: bool = False):
+    # write the exec times of `iterations` insert runs (after `warmup` unrecorded ones) to csv & average them
     print('Averaging RBT insert..')
-    remove_file('rbt', 'insert')
-    lines_to_write = []
-    for i in range(iterations):
-        # re-initialize tree each time
-        rbt = RedBlackTree()
-        exec_times = rbt_insert(rbt)
-        
-        # write each execution time one by one
-        lines_to_write = get_lines_to_write(i, exec_times, 'rbt')
-        
-        for line in lines_to_write:
-            write_to_file(line, 'rbt', 'insert')
-    
-    compute_avg('rbt', 'insert')
-    
-def avg_exec_time_search(iterations: int = 3):
-    '''
-    Execute the tree operation for the specified no of iterations
-    & write the execution times in csv. Finally calculate average
-    execution time & write back.
-    '''
+    average_exec_times(RedBlackTree, 'rbt', 'insert', iterations, warmup, disable_gc)
+
+def avg_exec_time_search(iterations: int = 3, warmup: int = 0, disable_gc: bool = False):
+    # write the exec times of `iterations` search runs (after `warmup` unrecorded ones) to csv & average them
     print('Averaging RBT search..')
-    remove_file('rbt', 'search')
-    lines_to_write = []
-    for i in range(iterations):
-        # re-initialize tree each time
-        rbt = RedBlackTree()
-        # ignore insertion for this
-        rbt_insert(rbt)
-        exec_times = rbt_search(rbt)
-        
-        # write each execution time one by one
-        lines_to_write = get_lines_to_write(i, exec_times, 'rbt')
-        
-        for line in lines_to_write:
-            write_to_file(line, 'rbt', 'search')
-    
-    compute_avg('rbt', 'search')
-    
-def avg_exec_time_delete(iterations: int = 3):
-    '''
-    Execute the tree operation for the specified no of iterations
-    & write the execution times in csv. Finally calculate average
-    execution time & write back.
-    '''
+    average_exec_times(RedBlackTree, 'rbt', 'search', iterations, warmup, disable_gc)
+
+def avg_exec_time_delete(iterations: int = 3, warmup: int = 0, disable_gc: bool = False):
+    # write the exec times of `iterations` delete runs (after `warmup` unrecorded ones) to csv & average them
     print('Averaging RBT delete..')
-    remove_file('rbt', 'delete')
-    lines_to_write = []
-    for i in range(iterations):
-        # re-initialize tree each time
-        rbt = RedBlackTree()
-        # ignore insertion for this
-        rbt_insert(rbt)
-        exec_times = rbt_delete(rbt)
-        
-        # write each execution time one by one
-        lines_to_write = get_lines_to_write(i, exec_times, 'rbt')
-        
-        for line in lines_to_write:
-            write_to_file(line, 'rbt', 'delete')
-    
-    compute_avg('rbt', 'delete')
-    
+    average_exec_times(RedBlackTree, 'rbt', 'delete', iterations, warmup, disable_gc)
+
 if __name__ == '__main__':
     # initialize the tree
     # rbt = RedBlackTree()
@@ -1,21 +1,80 @@
-import sys
-from datetime import datetime
-from file_utils import read_data_files, write_to_file, compute_avg, get_lines_to_write, remove_file
-
-sys.setrecursionlimit(30000)
+import heapq
+import random
+from operator import attrgetter
+from harness import average_exec_times, read_op_files, run_op
+from timing import Timer
+from tree_utils import check_sorted, iter_keys, keys_between, reverse_keys, run_lengths, search_many
 
 
 class Node:
+    __slots__ = ('data', 'parent', 'left', 'right', 'size', 'height', 'count')
+
     def __init__(self, data):
         self.data = data
         self.parent = None
         self.left = None
         self.right = None
+        self.size = 1  # no of keys in the subtree rooted here
+        self.height = 1  # height of the subtree rooted here
+        self.count = 1  # copies of the key, above 1 only in multiset mode
+
+
+# splaying policies of SplayTree.splay
+SPLAY_POLICIES = ('full', 'semi', 'depth', 'random')
 
 
 class SplayTree:
-    def __init__(self):
+    '''
+    Splay tree. `policy` sets how far splay() moves an accessed (searched or
+    inserted) node up:
+    - full: all the way to the root, the classic splay
+    - semi: semi-splaying, each zig-zig step rotates only the parent over the
+      grandparent & carries on from the parent, so the node rises about half
+      its depth while the path to it is roughly halved
+    - depth: full splay, but only when the node is deeper than depth_threshold
+    - random: full splay with the given probability (from a random.Random
+      seeded with seed, so runs are repeatable)
+    Delete always splays fully since it splits the tree at the root.
+    With multiset=True a duplicate insert bumps the count of the key's node
+    instead of adding a node, & delete drops one copy at a time.
+    '''
+
+    def __init__(self, policy: str = 'full', depth_threshold: int = 16, probability: float = 0.5, seed: int = 0,
+                 multiset: bool = False):
+        if policy not in SPLAY_POLICIES:
+            raise ValueError(f'Unknown splay policy: {policy} (choose from {", ".join(SPLAY_POLICIES)})')
         self.root = None
+        self.policy = policy
+        self.depth_threshold = depth_threshold
+        self.probability = probability
+        self.seed = seed
+        self._rng = random.Random(seed)
+        self.multiset = multiset
+
+    # an empty tree with the same settings
+    def _empty_copy(self):
+        return type(self)(self.policy, self.depth_threshold, self.probability, self.seed, self.multiset)
+
+    def __len__(self):
+        return self.root.size if self.root is not None else 0
+
+    @property
+    def height(self):
+        return self.root.height if self.root is not None else 0
+
+    # recompute the size & height of node from its children
+    def _update(self, node):
+        size = node.count
+        height = 0
+        if node.left is not None:
+            size += node.left.size
+            height = node.left.height
+        if node.right is not None:
+            size += node.right.size
+            if node.right.height > height:
+                height = node.right.height
+        node.size = size
+        node.height = height + 1
 
     # rotate left at node x
     def left_rotate(self, x):
@@ -33,6 +92,9 @@ class SplayTree:
             x.parent.right = y
         y.left = x
         x.parent = y
+        # x is now below y, so refresh x first
+        self._update(x)
+        self._update(y)
 
     # rotate right at node x
     def right_rotate(self, x):
@@ -51,9 +113,45 @@ class SplayTree:
 
         y.right = x
         x.parent = y
+        # x is now below y, so refresh x first
+        self._update(x)
+        self._update(y)
 
-    # Splaying operation. It moves x to the root of the tree
+    # Splaying operation, moving x up as set by the tree's policy
+    # returns False when x was left in place (& its ancestors untouched)
     def splay(self, x):
+        policy = self.policy
+        if policy == 'full':
+            self._splay_to_root(x)
+        elif policy == 'semi':
+            self._semi_splay(x)
+        elif policy == 'depth':
+            # walk up at most depth_threshold + 1 levels to tell if x is deep enough
+            depth = 0
+            node = x.parent
+            while node is not None:
+                depth += 1
+                if depth > self.depth_threshold:
+                    self._splay_to_root(x)
+                    return True
+                node = node.parent
+            return False
+        elif self._rng.random() < self.probability:
+            self._splay_to_root(x)
+        else:
+            return False
+        return True
+
+    # recompute size & height from node up to the root
+    def _update_path(self, node):
+        while node is not None:
+            self._update(node)
+            node = node.parent
+
+    # It moves x to the root of the tree
+    # every node whose subtree changed on the way is an ancestor of x, and the
+    # rotations refresh each of them, so sizes & heights stay correct
+    def _splay_to_root(self, x):
         while x.parent is not None:
             if x.parent.parent is None:
                 if x == x.parent.left:
@@ -79,8 +177,38 @@ class SplayTree:
                 self.right_rotate(x.parent)
                 self.left_rotate(x.parent)
 
+    # Semi-splaying: like splaying, except a zig-zig step only rotates the
+    # parent over the grandparent & continues from the parent
+    def _semi_splay(self, x):
+        while x.parent is not None:
+            p = x.parent
+            g = p.parent
+            if g is None:
+                if x == p.left:
+                    # zig rotation
+                    self.right_rotate(p)
+                else:
+                    # zag rotation
+                    self.left_rotate(p)
+            elif x == p.left and p == g.left:
+                # zig-zig rotation, top half only
+                self.right_rotate(g)
+                x = p
+            elif x == p.right and p == g.right:
+                # zag-zag rotation, top half only
+                self.left_rotate(g)
+                x = p
+            elif x == p.right:
+                # zig-zag rotation
+                self.left_rotate(p)
+                self.right_rotate(x.parent)
+            else:
+                # zag-zig rotation
+                self.right_rotate(p)
+                self.left_rotate(x.parent)
+
     # joins two trees s and t
-    def join(self, s, t):
+    def _join(self, s, t):
         if s is None:
             return t
 
@@ -88,18 +216,21 @@ class SplayTree:
             return s
 
         x = self.maximum(s)
-        self.splay(x)
+        self._splay_to_root(x)
         x.right = t
         t.parent = x
+        self._update(x)
         return x
 
+    # walk down from node to the node holding key (None on a miss) with a
+    # loop, since a splay tree can be a chain as deep as its size
     def search_tree_helper(self, node, key):
-        if node is None or key == node.data:
-            return node
-
-        if key < node.data:
-            return self.search_tree_helper(node.left, key)
-        return self.search_tree_helper(node.right, key)
+        while node is not None and key != node.data:
+            if key < node.data:
+                node = node.left
+            else:
+                node = node.right
+        return node
 
     def delete_node_helper(self, node, key):
         x = None
@@ -118,7 +249,12 @@ class SplayTree:
             return False
 
         # split operation
-        self.splay(x)
+        self._splay_to_root(x)
+        if x.count > 1:
+            # drop one copy of a multiset key, the node stays
+            x.count -= 1
+            self._update(x)
+            return True
         if x.right is not None:
             t = x.right
             t.parent = None
@@ -133,7 +269,7 @@ class SplayTree:
         if s.left is not None:
             s.left.parent = None
 
-        self.root = self.join(s.left, t)
+        self.root = self._join(s.left, t)
         s = None
         return True
 
@@ -151,17 +287,25 @@ class SplayTree:
 
     # insert the key to the tree in its appropriate position
     def insert(self, key):
-        node = Node(key)
         y = None
         x = self.root
+        multiset = self.multiset
 
         while x is not None:
+            if multiset and key == x.data:
+                # one more copy: no new node, the sizes up from x grow
+                x.count += 1
+                self._update_path(x)
+                self.splay(x)
+                return
             y = x
-            if node.data < x.data:
+            if key < x.data:
                 x = x.left
             else:
                 x = x.right
 
+        node = Node(key)
+
         # y is parent of x
         node.parent = y
         if y is None:
@@ -171,7 +315,9 @@ class SplayTree:
         else:
             y.right = node
         # splay the node
-        self.splay(node)
+        if not self.splay(node):
+            # it stayed where it was, so refresh the sizes & heights above it
+            self._update_path(y)
 
     # search the tree for the key k
     # and return the corresponding node
@@ -179,189 +325,430 @@ class SplayTree:
         x = self.search_tree_helper(self.root, k)
         if x is not None:
             self.splay(x)
+        return x
 
     # delete the node from the tree
     def delete(self, data):
         self.delete_node_helper(self.root, data)
         
+    def search_many(self, keys, splay=True):
+        '''
+        Look up a batch of keys & return a presence mask in input order.
+        With splay=True each key is searched (and splayed) one by one, as a
+        loop over search would; splay=False leaves the tree shape untouched,
+        walking the tree once for the whole batch when it is large enough
+        (see tree_utils.search_many).
+        '''
+        if splay:
+            return [self.search(key) is not None for key in keys]
+        return search_many(self.root, keys, lambda key: self.search_tree_helper(self.root, key) is not None,
+                           attrgetter('data'), attrgetter('left'), attrgetter('right'), len(self))
+
+    def __iter__(self):
+        '''
+        Yield the keys in ascending order, lazily, holding at most one stack
+        entry per level of the tree. Multiset keys are yielded once per copy.
+        '''
+        return iter_keys(self.root,
+                         attrgetter('data'), attrgetter('left'), attrgetter('right'), attrgetter('count'))
+
+    def __reversed__(self):
+        '''
+        Yield the keys in descending order, lazily.
+        '''
+        return reverse_keys(self.root,
+                            attrgetter('data'), attrgetter('left'), attrgetter('right'), attrgetter('count'))
+
+    def items_between(self, lo, hi):
+        '''
+        Yield the keys with lo <= key <= hi in ascending order in O(h + k)
+        for k keys in the range. Subtrees entirely below lo are skipped.
+        '''
+        return keys_between(self.root, lo, hi,
+                            attrgetter('data'), attrgetter('left'), attrgetter('right'), attrgetter('count'))
+
+    def split(self, key):
+        '''
+        Split the tree into two splay trees (left, right) with the same
+        settings, left holding the keys < key & right the keys >= key, in
+        amortized O(log n): the last node on the search path for key is
+        splayed to the root & one of its subtrees cut off. This tree is left
+        empty.
+        '''
+        left, right = self._empty_copy(), self._empty_copy()
+        x = self.root
+        if x is None:
+            return left, right
+        while True:
+            child = x.left if key <= x.data else x.right
+            if child is None:
+                break
+            x = child
+        self._splay_to_root(x)
+        self.root = None
+        if x.data < key:
+            # x & its left subtree go left
+            cut = x.right
+            x.right = None
+            left.root, right.root = x, cut
+        else:
+            cut = x.left
+            x.left = None
+            left.root, right.root = cut, x
+        if cut is not None:
+            cut.parent = None
+        self._update(x)
+        return left, right
+
+    def join(self, other):
+        '''
+        Move every key of other, a SplayTree whose keys are all >= the keys
+        of this tree (> in multiset mode), into this tree in amortized
+        O(log n): the maximum of this tree is splayed to the root & other
+        hung as its right subtree. other is left empty. Raises ValueError
+        when the key ranges overlap.
+        '''
+        if self.root is not None and other.root is not None:
+            last = self.maximum(self.root).data
+            first = other.minimum(other.root).data
+            if last > first or (self.multiset and last == first):
+                raise ValueError('Keys of the joined tree must come after the keys of this tree')
+        self.root = self._join(self.root, other.root)
+        other.root = None
+
+    def union(self, other):
+        '''
+        Move every key of other, a SplayTree with keys in any range, into
+        this tree by inserting the keys of the smaller of the two into the
+        larger, in ascending order. Under full splaying consecutive inserts
+        land next to the last one, so m keys into n take about
+        O(m log(n/m + 1)) amortized rather than O(m log n). In multiset mode
+        the counts of keys in both trees are added up. other is left empty.
+        '''
+        if len(other) > len(self):
+            self.root, other.root = other.root, self.root
+        if other.root is not None:
+            for key in list(other):
+                self.insert(key)
+            other.root = None
+
+    @classmethod
+    def from_sorted(cls, values, **settings):
+        '''
+        Build a balanced splay tree from values in ascending order in O(n).
+        settings (policy etc.) are passed on to the constructor. In multiset
+        mode repeated values become the count of one node.
+        '''
+        tree = cls(**settings)
+        tree._build_balanced(check_sorted(values))
+        return tree
+
+    def bulk_load(self, values):
+        '''
+        Load values (in any order) into the tree by merging them with the
+        existing keys & rebuilding, instead of one splay per inserted key.
+        '''
+        new_values = sorted(values)
+        if self.root is not None:
+            new_values = heapq.merge(self, new_values)
+        self._build_balanced(check_sorted(new_values))
+
+    def _build_balanced(self, values):
+        counts = None
+        if self.multiset:
+            values, counts = run_lengths(values)
+        self.root = self._build_subtree(values, 0, len(values) - 1, None, counts)
+
+    def _build_subtree(self, values, lo, hi, parent, counts=None):
+        if lo > hi:
+            return None
+        mid = (lo + hi) // 2
+        node = Node(values[mid])
+        node.parent = parent
+        if counts:
+            node.count = counts[mid]
+        node.left = self._build_subtree(values, lo, mid - 1, node, counts)
+        node.right = self._build_subtree(values, mid + 1, hi, node, counts)
+        self._update(node)
+        return node
+
+    def clone(self):
+        '''
+        Return a copy of the tree with the same shape, keys & size/height
+        fields, copied node for node in O(n): no key comparisons & no splaying.
+        '''
+        copy = self._empty_copy()
+        if self.root is None:
+            return copy
+        copy.root = Node(self.root.data)
+        stack = [(self.root, copy.root)]
+        while stack:
+            node, node_copy = stack.pop()
+            node_copy.count = node.count
+            node_copy.size = node.size
+            node_copy.height = node.height
+            if node.left is not None:
+                child = Node(node.left.data)
+                child.parent = node_copy
+                node_copy.left = child
+                stack.append((node.left, child))
+            if node.right is not None:
+                child = Node(node.right.data)
+                child.parent = node_copy
+                node_copy.right = child
+                stack.append((node.right, child))
+        return copy
+
     def tree_height(self):
-        return self._height_helper(self.root)
+        # height is maintained on every rotation, so this is O(1)
+        with Timer() as timer:
+            height = self.height
+        return (height, timer.elapsed)
 
-    def _height_helper(self, node):
-        start = datetime.now()
-        if node is None:
-            end = datetime.now()
-            return (0, end - start)
-        
-        left_height = self._height_helper(node.left)[0]
-        right_height = self._height_helper(node.right)[0]
-        
-        height = max(left_height, right_height) + 1
-        end = datetime.now()
-        return (height, end - start)
 
-def st_insert(st: SplayTree):
-    insert_values = read_data_files('insert')
-    
-    # execution times for insertion of each file
-    exec_times = []
-    
-    # execution times for tree_height
-    # this should not be returned for coder runner activity
-    tree_heights = []
-    
+class TopDownSplayTree(SplayTree):
+    '''
+    Splay tree using Sleator & Tarjan's top-down splaying: the search path is
+    walked once, from the root down, and split as it goes into a left tree of
+    smaller keys and a right tree of larger keys, which are hung under the
+    accessed node at the end. A miss splays the last node visited. There is
+    no second, bottom-up climb through parent pointers as in SplayTree.
+    Parent links, sizes & heights are kept, so the rest of the SplayTree
+    methods work on it unchanged. Every access splays fully, so policy must
+    be 'full'.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.policy != 'full':
+            raise ValueError(f'TopDownSplayTree only splays fully, got policy: {self.policy}')
+        # roots of the left & right trees while splaying
+        self._header = Node(None)
+
+    def _splay_top_down(self, key):
+        '''
+        Splay the node holding key, or the last node on its search path, to
+        the root & return it (None for an empty tree).
+        '''
+        t = self.root
+        if t is None or key == t.data:
+            return t
+        header = self._header
+        header.left = header.right = None
+        left_max = right_min = header
+        # nodes linked into the left & right trees, top down; only their
+        # children on the split side change later, so sizes are fixed up last
+        left_nodes = []
+        right_nodes = []
+        while True:
+            if key < t.data:
+                if t.left is None:
+                    break
+                if key < t.left.data:
+                    # zig-zig: rotate right first
+                    y = t.left
+                    t.left = y.right
+                    if y.right is not None:
+                        y.right.parent = t
+                    y.right = t
+                    t.parent = y
+                    self._update(t)
+                    t = y
+                    if t.left is None:
+                        break
+                # link t into the right tree
+                right_min.left = t
+                t.parent = right_min
+                right_nodes.append(t)
+                right_min = t
+                t = t.left
+            elif key > t.data:
+                if t.right is None:
+                    break
+                if key > t.right.data:
+                    # zag-zag: rotate left first
+                    y = t.right
+                    t.right = y.left
+                    if y.left is not None:
+                        y.left.parent = t
+                    y.left = t
+                    t.parent = y
+                    self._update(t)
+                    t = y
+                    if t.right is None:
+                        break
+                # link t into the left tree
+                left_max.right = t
+                t.parent = left_max
+                left_nodes.append(t)
+                left_max = t
+                t = t.right
+            else:
+                break
+
+        # assemble: t's subtrees go to the inner ends of the left & right
+        # trees, which then become t's subtrees
+        left_max.right = t.left
+        if t.left is not None:
+            t.left.parent = left_max
+        right_min.left = t.right
+        if t.right is not None:
+            t.right.parent = right_min
+        t.left = header.right
+        t.right = header.left
+        if t.left is not None:
+            t.left.parent = t
+        if t.right is not None:
+            t.right.parent = t
+        t.parent = None
+        header.left = header.right = None
+
+        for node in reversed(left_nodes):
+            self._update(node)
+        for node in reversed(right_nodes):
+            self._update(node)
+        self._update(t)
+        self.root = t
+        return t
+
+    def _splay_max_top_down(self, t):
+        '''
+        Splay the maximum of the subtree rooted at t to its root top-down &
+        return it, the way _splay_top_down would for a key above every key:
+        the walk only goes right, so every node passed joins the left tree.
+        '''
+        header = self._header
+        header.right = None
+        left_max = header
+        left_nodes = []
+        while t.right is not None:
+            # zag-zag: rotate left first
+            y = t.right
+            t.right = y.left
+            if y.left is not None:
+                y.left.parent = t
+            y.left = t
+            t.parent = y
+            self._update(t)
+            t = y
+            if t.right is None:
+                break
+            # link t into the left tree
+            left_max.right = t
+            t.parent = left_max
+            left_nodes.append(t)
+            left_max = t
+            t = t.right
+
+        # t has no right subtree, only its left one goes to the left tree
+        left_max.right = t.left
+        if t.left is not None:
+            t.left.parent = left_max
+        t.left = header.right
+        if t.left is not None:
+            t.left.parent = t
+        t.parent = None
+        header.right = None
+
+        for node in reversed(left_nodes):
+            self._update(node)
+        self._update(t)
+        return t
+
+    # insert the key to the tree, splitting it around the splayed node
+    def insert(self, key):
+        t = self._splay_top_down(key)
+        if self.multiset and t is not None and t.data == key:
+            # one more copy, t is the root now
+            t.count += 1
+            self._update(t)
+            return
+        node = Node(key)
+        if t is not None:
+            if key < t.data:
+                node.left = t.left
+                node.right = t
+                t.left = None
+            else:
+                # equal keys go to the right, as in SplayTree.insert
+                node.right = t.right
+                node.left = t
+                t.right = None
+            if node.left is not None:
+                node.left.parent = node
+            if node.right is not None:
+                node.right.parent = node
+            self._update(t)
+            self._update(node)
+        self.root = node
+
+    # search the tree for the key k
+    # and return the corresponding node
+    def search(self, k):
+        x = self._splay_top_down(k)
+        if x is not None and x.data == k:
+            return x
+        return None
+
+    # delete the node from the tree
+    def delete(self, data):
+        x = self._splay_top_down(data)
+        if x is None or x.data != data:
+            return
+        if x.count > 1:
+            # drop one copy of a multiset key, the node stays
+            x.count -= 1
+            self._update(x)
+            return
+        if x.left is None:
+            root = x.right
+        else:
+            # the maximum of the left subtree has no right child once splayed
+            # to its top, so the right subtree hangs there
+            root = self._splay_max_top_down(x.left)
+            root.right = x.right
+            if x.right is not None:
+                x.right.parent = root
+            self._update(root)
+        if root is not None:
+            root.parent = None
+        self.root = root
+
+def st_insert(st: SplayTree, disable_gc: bool = False, stream: bool = False):
     # insert values from each file into the tree
-    for values in insert_values.values():
-        start = datetime.now()
-        
-        # insert each value from file to the tree
-        for value in values:
-            st.insert(value)
-            
-        end = datetime.now()
-        # add execution time for each file
-        exec_times.append(end - start)
-        
-        # add tree_height for each file
-        tree_heights.append(st.tree_height()[0])
+    insert_values = read_op_files('insert', stream=stream)
+    return run_op(st, 'insert', insert_values, disable_gc)
         
-    # return only exec_times for code runner
-    # return exec_times
-    return (exec_times, tree_heights)
-        
-def st_search(st: SplayTree):
+def st_search(st: SplayTree, disable_gc: bool = False, stream: bool = False):
     # initialize the empty tree first
-    st_insert(st)
-    
-    search_values = read_data_files('search')
-    
-    # execution times for search of each file
-    exec_times = []
-    
-    # execution times for tree_height
-    # this should not be returned for coder runner activity
-    tree_heights = []
+    st_insert(st, disable_gc, stream)
     
     # search values of each file from the tree
-    for values in search_values.values():
-        start = datetime.now()
-        
-        # search each value of file from the tree
-        for value in values:
-            st.search(value)
-            
-        end = datetime.now()
-        # add execution time for each file
-        exec_times.append(end - start)
-        
-        # add tree_height for each file
-        tree_heights.append(st.tree_height()[0])
-        
-    # return only exec_times for code runner
-    # return exec_times
-    return (exec_times, tree_heights)
+    search_values = read_op_files('search', stream=stream)
+    return run_op(st, 'search', search_values, disable_gc)
 
-def st_delete(st: SplayTree):
+def st_delete(st: SplayTree, disable_gc: bool = False, stream: bool = False):
     # initialize the empty tree first
-    st_insert(st)
-    
-    delete_values = read_data_files('delete')
-    
-    # execution times for deletion of each file
-    exec_times = []
-    
-    # execution times for tree_height
-    # this should not be returned for coder runner activity
-    tree_heights = []
+    st_insert(st, disable_gc, stream)
     
     # delete values of each file from the tree
-    for values in delete_values.values():
-        start = datetime.now()
-        
-        # delete each value of file from the tree
-        for value in values:
-            st.delete(value)
-            
-        end = datetime.now()
-        # add execution time for each file
-        exec_times.append(end - start)
-        
-        # add tree_height for each file
-        tree_heights.append(st.tree_height()[0])
-        
-    # return only exec_times for code runner
-    # return exec_times
-    return (exec_times, tree_heights)
+    delete_values = read_op_files('delete', stream=stream)
+    return run_op(st, 'delete', delete_values, disable_gc)
     
-def avg_exec_time_insert(iterations: int = 3):
-    '''
-    Execute the tree operation for the specified no of iterations
-    & write the execution times in csv. Finally calculate average
-    execution time & write back.
-    '''
+def avg_exec_time_insert(iterations: int = 3, warmup: int = 0, disable_gc: bool = False):
+    # write the exec times of `iterations` insert runs (after `warmup` unrecorded ones) to csv & average them
     print('Averaging ST insert..')
-    remove_file('st', 'insert')
-    lines_to_write = []
-    for i in range(iterations):
-        # re-initialize tree each time
-        st = SplayTree()
-        exec_times = st_insert(st)
-        
-        # write each execution time one by one
-        lines_to_write = get_lines_to_write(i, exec_times, 'st')
-        
-        for line in lines_to_write:
-            write_to_file(line, 'st', 'insert')
-    
-    compute_avg('st', 'insert')
-    
-def avg_exec_time_search(iterations: int = 3):
-    '''
-    Execute the tree operation for the specified no of iterations
-    & write the execution times in csv. Finally calculate average
-    execution time & write back.
-    '''
+    average_exec_times(SplayTree, 'st', 'insert', iterations, warmup, disable_gc)
+
+def avg_exec_time_search(iterations: int = 3, warmup: int = 0, disable_gc: bool = False):
+    # write the exec times of `iterations` search runs (after `warmup` unrecorded ones) to csv & average them
     print('Averaging ST search..')
-    remove_file('st', 'search')
-    lines_to_write = []
-    for i in range(iterations):
-        # re-initialize tree each time
-        st = SplayTree()
-        # ignore insertion for this
-        st_insert(st)
-        exec_times = st_search(st)
-        
-        # write each execution time one by one
-        lines_to_write = get_lines_to_write(i, exec_times, 'st')
-        
-        for line in lines_to_write:
-            write_to_file(line, 'st', 'search')
-    
-    compute_avg('st', 'search')
-    
-def avg_exec_time_delete(iterations: int = 3):
-    '''
-    Execute the tree operation for the specified no of iterations
-    & write the execution times in csv. Finally calculate average
-    execution time & write back.
-    '''
+    average_exec_times(SplayTree, 'st', 'search', iterations, warmup, disable_gc)
+
+def avg_exec_time_delete(iterations: int = 3, warmup: int = 0, disable_gc: bool = False):
+    # write the exec times of `iterations` delete runs (after `warmup` unrecorded ones) to csv & average them
     print('Averaging ST delete..')
-    remove_file('st', 'delete')
-    lines_to_write = []
-    for i in range(iterations):
-        # re-initialize tree each time
-        st = SplayTree()
-        # ignore insertion for this
-        st_insert(st)
-        exec_times = st_delete(st)
-        
-        # write each execution time one by one
-        lines_to_write = get_lines_to_write(i, exec_times, 'st')
-        
-        for line in lines_to_write:
-            write_to_file(line, 'st', 'delete')
-    
-    compute_avg('st', 'delete')
+    average_exec_times(SplayTree, 'st', 'delete', iterations, warmup, disable_gc)
 
 if __name__ == '__main__':
     # initialize the tree
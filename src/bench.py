@@ -0,0 +1,118 @@
+'''
+Benchmark runner for every tree engine & operation.
+
+    python bench.py --trees bst,rbt,st --ops insert,search --iterations 20
+
+Results are written to {op}_{tree}_exec_times.csv & {op}_{tree}_summary.csv
+in the output directory, and optionally as JSON lines (--json).
+'''
+import argparse
+import contextlib
+import functools
+import json
+import os
+import sys
+from ARBT import ArrayRedBlackTree
+from BST import BinarySearchTree
+from BTree import BTree
+from RBT import RedBlackTree
+from ST import SplayTree, TopDownSplayTree
+from file_utils import ResultWriter, compute_avg
+from harness import OP_TYPES, load_datasets, run_benchmark, run_benchmarks_parallel
+
+# tree engines by name, each a callable returning an empty tree exposing
+# insert/search/delete & tree_height(); register new engines here
+ENGINES = {
+    'bst': BinarySearchTree,
+    'rbt': RedBlackTree,
+    'st': SplayTree,
+    'st_td': TopDownSplayTree,
+    'arbt': ArrayRedBlackTree,
+    'btree': BTree,
+}
+
+DEFAULT_TREES = ('bst', 'rbt', 'st')
+
+
+def _csv_list(choices):
+    # argparse type for comma separated names out of choices
+    def parse(value):
+        names = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = [name for name in names if name not in choices]
+        if unknown:
+            raise argparse.ArgumentTypeError(f'unknown: {", ".join(unknown)} (choose from {", ".join(choices)})')
+        return names
+    return parse
+
+def _cpu_list(value):
+    # argparse type for --pin-cpus, 'all' meaning every cpu this process may use
+    if value == 'all':
+        return sorted(os.sched_getaffinity(0))
+    try:
+        return [int(cpu) for cpu in value.split(',')]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'invalid cpu list: {value}')
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Run the tree benchmarks.')
+    parser.add_argument('--trees', type=_csv_list(tuple(ENGINES)), default=list(DEFAULT_TREES),
+                        help=f'comma separated trees out of {",".join(ENGINES)} (default: {",".join(DEFAULT_TREES)})')
+    parser.add_argument('--ops', type=_csv_list(OP_TYPES), default=list(OP_TYPES),
+                        help='comma separated operations (default: insert,search,delete)')
+    parser.add_argument('--iterations', type=int, default=3, help='recorded iterations per tree & op')
+    parser.add_argument('--warmup', type=int, default=0, help='unrecorded iterations run first')
+    parser.add_argument('--disable-gc', action='store_true', help='switch gc off while timing')
+    parser.add_argument('--multiset', action='store_true',
+                        help='run the trees in multiset mode, keeping a count per key instead of duplicate nodes')
+    parser.add_argument('--dataset', default=None, help='directory of the {op}_set{n}_data_{m}.txt files')
+    parser.add_argument('--stream', action='store_true',
+                        help='stream the data files from disk a chunk at a time instead of loading them in full')
+    parser.add_argument('--output-dir', default=None, help='directory for the csv results')
+    parser.add_argument('--json', default=None, help="write every result as a JSON line to this file ('-' for stdout)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help='run (tree, op, iteration) jobs across this many processes (default: 1, serial)')
+    parser.add_argument('--pin-cpus', type=_cpu_list, nargs='?', const='all', default=None,
+                        help='pin each worker process to one cpu, out of a comma separated list (default: all usable cpus)')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    # keep stdout clean for the JSON lines when they are written there
+    log_output = sys.stderr if args.json == '-' else sys.stdout
+    engines = {tree_type: ENGINES[tree_type] for tree_type in args.trees}
+    if args.multiset:
+        engines = {tree_type: functools.partial(make_tree, multiset=True) for tree_type, make_tree in engines.items()}
+    records = []
+    with contextlib.redirect_stdout(log_output):
+        with ResultWriter(output_dir=args.output_dir) as writer:
+            if args.workers > 1:
+                print(f'Running {len(args.trees) * len(args.ops) * args.iterations} jobs on {args.workers} workers..')
+                records = run_benchmarks_parallel(engines, tuple(args.ops), args.iterations, args.warmup,
+                                                  args.disable_gc, args.workers, args.pin_cpus, args.dataset, writer,
+                                                  args.stream)
+            else:
+                datasets = load_datasets(tuple(args.ops), args.dataset, args.stream)
+                for tree_type in args.trees:
+                    for op_type in args.ops:
+                        print(f'Running {tree_type} {op_type}..')
+                        records += run_benchmark(engines[tree_type], tree_type, op_type, datasets,
+                                                 args.iterations, args.warmup, args.disable_gc, writer)
+
+        for tree_type in args.trees:
+            for op_type in args.ops:
+                compute_avg(tree_type, op_type, args.output_dir)
+
+    if args.json:
+        output = sys.stdout if args.json == '-' else open(args.json, 'w')
+        try:
+            for record in records:
+                output.write(json.dumps(record) + '\n')
+        finally:
+            if output is not sys.stdout:
+                output.close()
+
+if __name__ == '__main__':
+    main()
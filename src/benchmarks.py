@@ -0,0 +1,341 @@
+import functools
+import gc
+import itertools
+import math
+import random
+import sys
+import tracemalloc
+import BST
+import RBT
+import ST
+from ARBT import ArrayRedBlackTree
+from BST import BinarySearchTree
+from BTree import BTree
+from datagen import generate_keys
+from timing import Timer, measure
+
+
+def _generate_keys(size: int, ordering: str = 'random' or 'sorted', seed: int = 0):
+    '''
+    Return `size` distinct integer keys, either shuffled or in ascending order.
+    Ascending keys turn a plain BST into a linked list (the degenerate case).
+    '''
+    keys = list(range(size))
+    if ordering == 'random':
+        random.Random(seed).shuffle(keys)
+    return keys
+
+def _time_per_op(op, keys):
+    '''
+    Call `op` on each key & return the mean time per call in microseconds.
+    '''
+    with Timer() as timer:
+        for key in keys:
+            op(key)
+    return timer.elapsed_ns / 1e3 / len(keys)
+
+class _RecursiveBST:
+    '''
+    The recursive insert & search the BST had before they were made
+    iterative, kept as the reference bench_bst_ops compares against.
+    Each level of the tree is one Python call.
+    '''
+    __slots__ = ('val', 'left', 'right')
+
+    def __init__(self, val=None):
+        self.val = val
+        self.left = None
+        self.right = None
+
+    def insert(self, val):
+        if self.val is None:
+            self.val = val
+        elif val == self.val:
+            return 'No duplicates allowed in BST'
+        elif val < self.val:
+            if self.left:
+                self.left.insert(val)
+            else:
+                self.left = _RecursiveBST(val)
+        else:
+            if self.right:
+                self.right.insert(val)
+            else:
+                self.right = _RecursiveBST(val)
+
+    def search(self, val):
+        if val == self.val:
+            return True
+        if val < self.val:
+            if self.left is None:
+                return False
+            return self.left.search(val)
+        if self.right is None:
+            return False
+        return self.right.search(val)
+
+def bench_bst_ops(sizes: tuple = (1000, 4000, 16000)):
+    '''
+    Time insert & search per op for the iterative BST against the recursive
+    reference on random & degenerate (sorted) inputs. The recursive walk makes
+    one call per level, so sorted inputs need the recursion limit raised above n
+    (it is raised for the run) & cost a call frame per level; the iterative
+    operations run on any input size.
+    '''
+    engines = {'iterative': BinarySearchTree, 'recursive': _RecursiveBST}
+    print(f'{"ordering":<10}{"n":>8}{"height":>8}' + ''.join(
+        f'{name + " insert":>20}{name + " search":>20}' for name in engines) + f'{"speedup":>10}')
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limit, max(sizes) + 1000))
+    try:
+        for ordering in ('random', 'sorted'):
+            for size in sizes:
+                keys = _generate_keys(size, ordering)
+                times = []
+                for engine in engines.values():
+                    tree = engine()
+                    times.append(_time_per_op(tree.insert, keys))
+                    times.append(_time_per_op(tree.search, keys))
+                    if isinstance(tree, BinarySearchTree):
+                        height = tree.tree_height()[0]
+                # us/op, then recursive over iterative time for insert + search
+                speedup = (times[2] + times[3]) / (times[0] + times[1])
+                print(f'{ordering:<10}{size:>8}{height:>8}' + ''.join(f'{t:>20.3f}' for t in times)
+                      + f'{speedup:>9.2f}x')
+    finally:
+        sys.setrecursionlimit(limit)
+
+
+def _unslotted(cls):
+    '''
+    Return a subclass of a slotted node class that carries an instance
+    __dict__ again, i.e. the node layout from before __slots__ was added.
+    '''
+    return type(f'Dict{cls.__name__}', (cls,), {})
+
+def _tree_bytes_per_node(build, keys):
+    '''
+    Build a tree from `keys` under tracemalloc & return the allocated bytes
+    per key. The keys are allocated beforehand so only the nodes are counted.
+    '''
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tree = build(keys)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del tree
+    return (after - before) / len(keys)
+
+def bench_node_memory(sizes: tuple = (10 ** 4, 10 ** 5, 10 ** 6)):
+    '''
+    Report bytes per node for each tree type with the slotted node classes
+    against dict-backed nodes. Pass 10 ** 7 in `sizes` for the largest run;
+    the dict-backed 10M-key trees need several GB of RAM.
+    '''
+    # the trees allocate nodes through their module globals, so the
+    # "before" layout is measured by swapping those for dict-backed subclasses
+    layouts = {
+        'slots': (BST.BinarySearchTree, RBT.Node, ST.Node),
+        'dict': (_unslotted(BST.BinarySearchTree), _unslotted(RBT.Node), _unslotted(ST.Node)),
+    }
+    original = layouts['slots']
+    print(f'{"tree":<6}{"n":>10}{"slots B/node":>16}{"dict B/node":>16}')
+    for size in sizes:
+        keys = list(range(size))
+        results = {}
+        for layout, (bst_cls, rbt_node, st_node) in layouts.items():
+            BST.BinarySearchTree, RBT.Node, ST.Node = bst_cls, rbt_node, st_node
+            try:
+                results[('bst', layout)] = _tree_bytes_per_node(bst_cls.from_sorted, keys)
+                results[('rbt', layout)] = _tree_bytes_per_node(RBT.RedBlackTree.from_sorted, keys)
+                results[('st', layout)] = _tree_bytes_per_node(ST.SplayTree.from_sorted, keys)
+            finally:
+                BST.BinarySearchTree, RBT.Node, ST.Node = original
+        for tree in ('bst', 'rbt', 'st'):
+            print(f'{tree:<6}{size:>10}{results[(tree, "slots")]:>16.1f}{results[(tree, "dict")]:>16.1f}')
+
+
+def bench_array_rbt(sizes: tuple = (10 ** 4, 10 ** 5, 10 ** 6)):
+    '''
+    Compare the object-per-node RedBlackTree with the array-backed
+    ArrayRedBlackTree on random int keys: bytes per node (tracemalloc) and
+    per-op insert/search times.
+    '''
+    engines = {'rbt': RBT.RedBlackTree, 'arbt': ArrayRedBlackTree}
+    print(f'{"tree":<6}{"n":>10}{"B/node":>10}{"insert us/op":>16}{"search us/op":>16}')
+    for size in sizes:
+        keys = _generate_keys(size, 'random')
+        for name, engine in engines.items():
+            tree = engine()
+            gc.collect()
+            tracemalloc.start()
+            before = tracemalloc.get_traced_memory()[0]
+            for key in keys:
+                tree.insert(key)
+            bytes_per_node = (tracemalloc.get_traced_memory()[0] - before) / size
+            tracemalloc.stop()
+            # time on a fresh tree, tracemalloc slows allocation down
+            tree = engine()
+            insert_time = _time_per_op(tree.insert, keys)
+            search_time = _time_per_op(tree.search, keys)
+            print(f'{name:<6}{size:>10}{bytes_per_node:>10.1f}{insert_time:>16.3f}{search_time:>16.3f}')
+
+
+def _linear_rank(tree, key):
+    # the pre-augmentation approach: walk the keys in order & count
+    count = 0
+    for value in tree:
+        if value >= key:
+            break
+        count += 1
+    return count
+
+def bench_order_statistics(sizes: tuple = (10 ** 3, 10 ** 4, 10 ** 5), queries: int = 200):
+    '''
+    Time RedBlackTree rank/select/count_range against linear in-order scans
+    answering the same queries.
+    '''
+    print(f'{"n":>8}{"rank us":>12}{"linear rank us":>16}{"select us":>12}{"linear select us":>18}{"range us":>12}')
+    for size in sizes:
+        tree = RBT.RedBlackTree.from_sorted(range(size))
+        rng = random.Random(size)
+        keys = [rng.randrange(size) for _ in range(queries)]
+        rank_time = _time_per_op(tree.rank, keys)
+        linear_rank_time = _time_per_op(lambda key: _linear_rank(tree, key), keys)
+        select_time = _time_per_op(tree.select, keys)
+        linear_select_time = _time_per_op(lambda k: next(itertools.islice(tree, k, None)), keys)
+        range_time = _time_per_op(lambda key: tree.count_range(key, key + size // 10), keys)
+        print(f'{size:>8}{rank_time:>12.2f}{linear_rank_time:>16.2f}{select_time:>12.2f}{linear_select_time:>18.2f}{range_time:>12.2f}')
+
+
+def _fit_exponent(sizes, values):
+    '''
+    Fit values ~ c * n ** b over sizes by least squares on log-log scale &
+    return the growth exponent b.
+    '''
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(value) for value in values]
+    x_mean = sum(xs) / len(xs)
+    y_mean = sum(ys) / len(ys)
+    return (sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys))
+            / sum((x - x_mean) ** 2 for x in xs))
+
+def _apply(op, keys):
+    for key in keys:
+        op(key)
+
+def bench_scaling(sizes: tuple = tuple(2 ** k for k in range(9, 14)), repeat: int = 3, tolerance: float = 0.5):
+    '''
+    Sweep n geometrically & record the per-op insert/search/delete times
+    (best of `repeat` runs) and tree heights of each tree against log2(n),
+    on random & sorted (degenerate) inserts. Search & delete run on clones
+    of the built tree, over every other inserted key.
+    Every op should cost O(log n), so per-op time / log2(n) should be flat:
+    its fitted growth exponent (the "excess" over log n) is ~0 when the
+    bound holds & ~1 for linear per-op cost. Ops whose excess exceeds
+    `tolerance` are flagged, e.g. every BST op on sorted input.
+    '''
+    engines = {'bst': BST.BinarySearchTree, 'rbt': RBT.RedBlackTree, 'st': ST.SplayTree}
+    ops = ('insert', 'search', 'delete')
+    print(f'{"tree":<6}{"ordering":<10}{"n":>8}{"log2 n":>8}{"height":>8}'
+          + ''.join(f'{op + " us/op":>16}' for op in ops))
+    # (tree, ordering) -> {op: [us per op for each size], 'height': [height for each size]}
+    results = {}
+    for name, engine in engines.items():
+        for ordering in ('random', 'sorted'):
+            times = results[(name, ordering)] = {op: [] for op in ops + ('height',)}
+            for size in sizes:
+                keys = _generate_keys(size, ordering)
+                queries = keys[::2]
+                tree = engine()
+                for key in keys:
+                    tree.insert(key)
+                height = tree.tree_height()[0]
+                times['height'].append(height)
+                times['insert'].append(measure(lambda tree: _apply(tree.insert, keys),
+                                               setup=engine, repeat=repeat) * 1e6 / len(keys))
+                for op in ('search', 'delete'):
+                    times[op].append(measure(lambda tree: _apply(getattr(tree, op), queries),
+                                             setup=tree.clone, repeat=repeat) * 1e6 / len(queries))
+                print(f'{name:<6}{ordering:<10}{size:>8}{math.log2(size):>8.1f}{height:>8}'
+                      + ''.join(f'{times[op][-1]:>16.3f}' for op in ops))
+
+    print(f'\n{"tree":<6}{"ordering":<10}{"op":<8}{"exponent":>10}{"excess over log n":>20}')
+    for (name, ordering), times in results.items():
+        # heights are printed alongside but not flagged: a splay tree may be
+        # a chain & still take amortized O(log n) per op
+        for op in ops + ('height',):
+            exponent = _fit_exponent(sizes, times[op])
+            excess = _fit_exponent(sizes, [t / math.log2(size) for t, size in zip(times[op], sizes)])
+            flag = '  <- departs from O(log n)' if op != 'height' and excess > tolerance else ''
+            print(f'{name:<6}{ordering:<10}{op:<8}{exponent:>10.2f}{excess:>20.2f}{flag}')
+
+
+def bench_splay_policies(size: int = 10 ** 5, accesses: int = 50000, repeat: int = 3):
+    '''
+    Time searches under each SplayTree splaying policy (and the top-down
+    splay tree) on uniform, zipf (hot keys) & clustered access streams over
+    a balanced tree of `size` keys. Each run starts from a clone of the same
+    tree, so a policy's tree reshapes over exactly one stream.
+    '''
+    keys = range(size)
+    threshold = size.bit_length()
+    trees = {
+        'full': ST.SplayTree.from_sorted(keys),
+        'semi': ST.SplayTree.from_sorted(keys, policy='semi'),
+        f'depth>{threshold}': ST.SplayTree.from_sorted(keys, policy='depth', depth_threshold=threshold),
+        'random p=0.1': ST.SplayTree.from_sorted(keys, policy='random', probability=0.1),
+        'top-down': ST.TopDownSplayTree.from_sorted(keys),
+    }
+    streams = {name: [key for chunk in generate_keys(name, accesses, size, seed=1) for key in chunk]
+               for name in ('uniform', 'zipf', 'clustered')}
+    print(f'{"policy":<14}' + ''.join(f'{name + " us/op":>18}' for name in streams))
+    for name, tree in trees.items():
+        times = [measure(lambda tree: _apply(tree.search, stream), setup=tree.clone, repeat=repeat) * 1e6 / accesses
+                 for stream in streams.values()]
+        print(f'{name:<14}' + ''.join(f'{time:>18.3f}' for time in times))
+
+
+def bench_btree(sizes: tuple = (10 ** 5, 10 ** 6), orders: tuple = (16, 64, 256), repeat: int = 1):
+    '''
+    Compare the B+-tree at several fanouts (orders) with the binary
+    RedBlackTree & SplayTree on random int keys: tree height, i.e. the
+    nodes a search dereferences on its way down, & per-op insert/search/delete
+    times (best of `repeat` runs, search & delete on clones of the built
+    tree over every other key). Pass 10 ** 7 in `sizes` for the largest run.
+    '''
+    engines = {f'btree{order}': functools.partial(BTree, order) for order in orders}
+    engines.update({'rbt': RBT.RedBlackTree, 'st': ST.SplayTree})
+    ops = ('insert', 'search', 'delete')
+    print(f'{"tree":<10}{"n":>10}{"height":>8}' + ''.join(f'{op + " us/op":>16}' for op in ops))
+    for size in sizes:
+        keys = _generate_keys(size, 'random')
+        queries = keys[::2]
+        for name, engine in engines.items():
+            tree = engine()
+            for key in keys:
+                tree.insert(key)
+            times = [measure(lambda tree: _apply(tree.insert, keys), setup=engine, repeat=repeat) * 1e6 / size]
+            for op in ('search', 'delete'):
+                times.append(measure(lambda tree: _apply(getattr(tree, op), queries),
+                                     setup=tree.clone, repeat=repeat) * 1e6 / len(queries))
+            print(f'{name:<10}{size:>10}{tree.tree_height()[0]:>8}' + ''.join(f'{time:>16.3f}' for time in times))
+
+
+BENCHMARKS = {
+    'bst_ops': bench_bst_ops,
+    'node_memory': bench_node_memory,
+    'array_rbt': bench_array_rbt,
+    'order_statistics': bench_order_statistics,
+    'scaling': bench_scaling,
+    'splay_policies': bench_splay_policies,
+    'btree': bench_btree,
+}
+
+if __name__ == '__main__':
+    # run the benchmarks named on the command line, or all of them
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        print(f'== {name} ==')
+        BENCHMARKS[name]()
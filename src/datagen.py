@@ -0,0 +1,171 @@
+'''
+Deterministic generator of insert/search/delete data files.
+
+    python datagen.py --output-dir data --insert sorted --search zipf --sizes 1000,100000 --seed 7
+
+writes {op}_set{n}_data_{m}.txt files (one int key per line) that
+read_data_files & bench.py --dataset pick up. --binary also writes the
+binary caches, so large datasets load without parsing the text.
+The same seed & arguments always give byte-identical files.
+'''
+import argparse
+import math
+import os
+import random
+from array import array
+from file_utils import write_data_file
+
+# keys generated (& held in memory) at a time
+_CHUNK_SIZE = 1 << 16
+
+# a prime larger than any key space, multiplying ranks by it modulo the key
+# space is a permutation that scatters the hot zipf ranks over the key space
+_SCATTER = (1 << 61) - 1
+
+
+def _uniform(rng: random.Random, size: int, key_space: int, params: dict):
+    # independent uniform draws from the key space, repeats included
+    randrange = rng.randrange
+    for start in range(0, size, _CHUNK_SIZE):
+        yield array('q', [randrange(key_space) for _ in range(min(_CHUNK_SIZE, size - start))])
+
+def _sorted(rng: random.Random, size: int, key_space: int, params: dict):
+    # ascending keys spread evenly over the key space
+    for start in range(0, size, _CHUNK_SIZE):
+        yield array('q', [i * key_space // size for i in range(start, min(start + _CHUNK_SIZE, size))])
+
+def _reverse_sorted(rng: random.Random, size: int, key_space: int, params: dict):
+    # descending keys, the sorted ones from the top down
+    for end in range(size, 0, -_CHUNK_SIZE):
+        yield array('q', [i * key_space // size for i in range(end - 1, max(end - _CHUNK_SIZE, 0) - 1, -1)])
+
+def _nearly_sorted(rng: random.Random, size: int, key_space: int, params: dict):
+    # sorted keys with a fraction of them swapped with a near neighbour
+    swap_fraction = params.get('swap_fraction', 0.01)
+    window = params.get('window', 16)
+    for chunk in _sorted(rng, size, key_space, params):
+        last = len(chunk) - 1
+        for _ in range(int(len(chunk) * swap_fraction)):
+            i = rng.randrange(len(chunk))
+            j = min(i + rng.randint(1, window), last)
+            chunk[i], chunk[j] = chunk[j], chunk[i]
+        yield chunk
+
+def _zipf(rng: random.Random, size: int, key_space: int, params: dict):
+    '''
+    Hot-key draws: rank r (0 = hottest) is drawn with probability about
+    proportional to 1 / (r + 1) ** exponent, by inverting the continuous
+    power law CDF, & mapped to a key scattered over the key space.
+    '''
+    exponent = params.get('exponent', 1.1)
+    random_ = rng.random
+    if exponent == 1:
+        log_top = math.log(key_space + 1)
+        draw = lambda: math.exp(random_() * log_top)
+    else:
+        power = 1 - exponent
+        top = (key_space + 1) ** power - 1
+        draw = lambda: (random_() * top + 1) ** (1 / power)
+    for start in range(0, size, _CHUNK_SIZE):
+        yield array('q', [(min(int(draw()), key_space) - 1) * _SCATTER % key_space
+                          for _ in range(min(_CHUNK_SIZE, size - start))])
+
+def _sequential(rng: random.Random, size: int, key_space: int, params: dict):
+    # consecutive keys from a random starting key, wrapping around the key space
+    first = rng.randrange(key_space)
+    for start in range(0, size, _CHUNK_SIZE):
+        yield array('q', [(first + i) % key_space for i in range(start, min(start + _CHUNK_SIZE, size))])
+
+def _clustered(rng: random.Random, size: int, key_space: int, params: dict):
+    # uniform draws from a few narrow key ranges at random points of the key space
+    clusters = params.get('clusters', 16)
+    width = max(key_space // (clusters * 16), 1)
+    centers = [rng.randrange(key_space) for _ in range(clusters)]
+    randrange, choice = rng.randrange, rng.choice
+    for start in range(0, size, _CHUNK_SIZE):
+        yield array('q', [(choice(centers) + randrange(width)) % key_space
+                          for _ in range(min(_CHUNK_SIZE, size - start))])
+
+# key distributions by name, each yielding array('q') chunks of keys in [0, key_space)
+DISTRIBUTIONS = {
+    'uniform': _uniform,
+    'sorted': _sorted,
+    'reverse_sorted': _reverse_sorted,
+    'nearly_sorted': _nearly_sorted,
+    'zipf': _zipf,
+    'sequential': _sequential,
+    'clustered': _clustered,
+}
+
+
+def generate_keys(distribution: str, size: int, key_space: int = None, seed=0, **params):
+    '''
+    Yield `size` int keys out of [0, key_space) (key_space defaults to size)
+    from the named distribution, as array('q') chunks. Keyword params tune
+    a distribution, e.g. exponent for zipf or clusters for clustered.
+    The keys depend only on the arguments, seed included.
+    '''
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f'Unknown distribution: {distribution}')
+    if size <= 0:
+        return
+    yield from DISTRIBUTIONS[distribution](random.Random(seed), size, key_space or size, params)
+
+def generate_data_files(output_dir: str, sizes: tuple = (1000, 10000, 100000), sets: int = 2,
+                        distributions: dict = None, query_ratio: float = 0.5, seed: int = 0,
+                        binary: bool = False, **params):
+    '''
+    Write {op}_set{n}_data_{m}.txt for n in 1..sets & one data file m per
+    size in sizes. The insert file of size s holds s keys out of [0, s) &
+    the search & delete files int(s * query_ratio) keys out of the same
+    range, so they mostly hit inserted keys. distributions maps each op to
+    a distribution name (uniform by default). Every file is seeded from
+    (seed, op, set, data), so files can be regenerated one by one.
+    With binary=True the binary caches are written too.
+    Returns the paths written.
+    '''
+    distributions = {'insert': 'uniform', 'search': 'uniform', 'delete': 'uniform', **(distributions or {})}
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for op_type in ('insert', 'search', 'delete'):
+        for set_count in range(1, sets + 1):
+            for data_count, size in enumerate(sizes, 1):
+                count = size if op_type == 'insert' else int(size * query_ratio)
+                file_path = os.path.join(output_dir, f'{op_type}_set{set_count}_data_{data_count}.txt')
+                chunks = generate_keys(distributions[op_type], count, size, f'{seed}:{op_type}:{set_count}:{data_count}', **params)
+                write_data_file(file_path, chunks, cache=binary)
+                paths.append(file_path)
+    return paths
+
+
+def _size_list(value):
+    # argparse type for comma separated sizes, e.g. 1000,1e6,1e8
+    try:
+        return [int(float(size)) for size in value.split(',')]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'invalid size list: {value}')
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Generate seeded insert/search/delete data files.')
+    parser.add_argument('--output-dir', required=True, help='directory to write the data files to')
+    parser.add_argument('--sizes', type=_size_list, default=[1000, 10000, 100000],
+                        help='comma separated insert file sizes, one data file per size (default: 1000,10000,100000)')
+    parser.add_argument('--sets', type=int, default=2, help='no of sets of data files (default: 2)')
+    for op_type in ('insert', 'search', 'delete'):
+        parser.add_argument(f'--{op_type}', choices=tuple(DISTRIBUTIONS), default='uniform',
+                            help=f'distribution of the {op_type} keys (default: uniform)')
+    parser.add_argument('--query-ratio', type=float, default=0.5,
+                        help='search & delete file size as a fraction of the insert file size (default: 0.5)')
+    parser.add_argument('--seed', type=int, default=0, help='seed of every file generated')
+    parser.add_argument('--binary', action='store_true', help='also write the binary caches of the files')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    distributions = {'insert': args.insert, 'search': args.search, 'delete': args.delete}
+    paths = generate_data_files(args.output_dir, tuple(args.sizes), args.sets, distributions,
+                                args.query_ratio, args.seed, args.binary)
+    print(f'Written {len(paths)} data files to {args.output_dir}')
+
+if __name__ == '__main__':
+    main()
@@ -1,117 +1,376 @@
 import os
+import re
 import csv
+import mmap
+import struct
+from array import array
 
 __all__ = [
     'read_data_files',
-    'write_to_file',
+    'stream_data_files',
+    'write_data_file',
+    'ResultWriter',
     'compute_avg',
-    'get_lines_to_write',
-    'remove_file'
+    'RunningStats',
+    'get_lines_to_write'
     ]
 
+# compact array typecodes for the numeric key types
+_ARRAY_TYPECODES = {int: 'q', float: 'd'}
+
+# bytes of a data file parsed at a time when streaming
+_STREAM_CHUNK_BYTES = 1 << 20
+
+# binary cache header: magic, source file size & source mtime (ns); 24 bytes
+# so the values after it stay 8-byte aligned
+_CACHE_MAGIC = b'BTCACHE1'
+_CACHE_HEADER = struct.Struct('<8sqq')
+
 def _get_csv_header_line():
     '''
     Return the list of header names to be written at the top of csv files.
     '''
     return ['Iteration', 'Set', 'Data', 'Exec_time', 'Tree_height', 'Tree_type']
 
-def _read_values_from_file(file_path: str):
+def _read_values_from_file(file_path: str, key_type=None):
     '''
-    Read values from data file provided & return a list.
+    Read values from data file provided & return them as a sequence.
+    - key_type=None: a list of the stripped lines (str keys)
+    - key_type=int / float: the whole file parsed in one step into a
+      compact array('q') / array('d')
+    - any other callable: a list of key_type(value) for each value
     '''
     
-    values = []
+    typecode = _ARRAY_TYPECODES.get(key_type)
+    values = array(typecode) if typecode else []
     try:
         with open(file_path, 'r') as file:
-            for line in file:
-                # Strip whitespace and newline characters
-                value = line.strip()
-                if value:  # Only add non-empty lines
-                    values.append(value)
+            content = file.read()
     except FileNotFoundError:
         print(f"File not found: {file_path}")
+        return values
     except IOError:
         print(f"Error reading file: {file_path}")
+        return values
     
+    return _parse_values(content, key_type)
+
+def _parse_values(content, key_type=None):
+    '''
+    Parse the text of a data file (or a whole-line slice of one) into values
+    as described in _read_values_from_file.
+    '''
+    if key_type is None:
+        # Strip whitespace and newline characters, only keep non-empty lines
+        return [value for value in (line.strip() for line in content.splitlines()) if value]
+    typecode = _ARRAY_TYPECODES.get(key_type)
+    if typecode:
+        return array(typecode, map(key_type, content.split()))
+    return [key_type(value) for value in content.split()]
+
+def _stream_values_from_file(file_path: str, key_type=None, chunk_bytes: int = _STREAM_CHUNK_BYTES):
+    '''
+    Memory-map the data file provided & yield its values in chunks, each
+    parsed from about chunk_bytes of the file cut at a line boundary. Only
+    one chunk of values is alive at a time, whatever the file size.
+    '''
+    try:
+        with open(file_path, 'rb') as file:
+            # mmap can't map an empty file
+            if os.fstat(file.fileno()).st_size == 0:
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                start = 0
+                size = len(mapped)
+                while start < size:
+                    end = min(start + chunk_bytes, size)
+                    if end < size:
+                        # extend the chunk to the end of its last line
+                        newline = mapped.find(b'\n', end - 1)
+                        end = size if newline == -1 else newline + 1
+                    yield _parse_values(mapped[start:end].decode(), key_type)
+                    start = end
+    except FileNotFoundError:
+        print(f"File not found: {file_path}")
+    except IOError:
+        print(f"Error reading file: {file_path}")
+
+def _cache_path(file_path: str, typecode: str):
+    '''
+    Return the path of the binary cache for a data file & array typecode,
+    e.g. insert_set1_data_1.txt.q.cache next to the source file.
+    '''
+    return f'{file_path}.{typecode}.cache'
+
+def _write_cache(file_path: str, values: array, source_stat):
+    '''
+    Dump parsed values to the binary cache of file_path, writing to a temp
+    file first so a partly written cache is never picked up.
+    '''
+    cache_path = _cache_path(file_path, values.typecode)
+    temp_path = f'{cache_path}.tmp'
+    try:
+        with open(temp_path, 'wb') as file:
+            file.write(_CACHE_HEADER.pack(_CACHE_MAGIC, source_stat.st_size, source_stat.st_mtime_ns))
+            values.tofile(file)
+        os.replace(temp_path, cache_path)
+    except OSError as e:
+        print(f'Error writing cache {cache_path}: {e}')
+
+def _load_cache(file_path: str, typecode: str, source_stat):
+    '''
+    Memory-map the binary cache of file_path & return its values as a
+    zero-copy memoryview, or None when there is no cache or it is stale
+    (the source's size or mtime changed since it was written).
+    '''
+    cache_path = _cache_path(file_path, typecode)
+    try:
+        with open(cache_path, 'rb') as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    
+    if len(mapped) < _CACHE_HEADER.size:
+        mapped.close()
+        return None
+    magic, size, mtime_ns = _CACHE_HEADER.unpack_from(mapped)
+    if magic != _CACHE_MAGIC or size != source_stat.st_size or mtime_ns != source_stat.st_mtime_ns:
+        mapped.close()
+        return None
+    
+    # the memoryview keeps the mapping alive for as long as the values are used
+    return memoryview(mapped)[_CACHE_HEADER.size:].cast(typecode)
+
+def _read_cached_values(file_path: str, key_type):
+    '''
+    Return the values of a data file from its binary cache, parsing the text
+    file & (re)writing the cache when it is missing or stale. Only int and
+    float keys are cached; other key types are parsed every time.
+    '''
+    typecode = _ARRAY_TYPECODES.get(key_type)
+    try:
+        source_stat = os.stat(file_path)
+    except OSError:
+        typecode = None
+    if not typecode:
+        return _read_values_from_file(file_path, key_type)
+    
+    values = _load_cache(file_path, typecode, source_stat)
+    if values is None:
+        values = _read_values_from_file(file_path, key_type)
+        _write_cache(file_path, values, source_stat)
     return values
 
-def read_data_files(op_type: str = 'insert' or 'search' or 'delete'):
+def _data_file_paths(op_type: str = 'insert' or 'search' or 'delete', data_dir: str = None):
     '''
-    Read all the files for specified type & return as a dictionary in the 
-    following format.
-    - 1_1:[] -> denotes set1_data_1: [values] 
-    - 1_2:[] -> denotes set1_data_2: [values] ...
+    Return (fileset, file path) for every data file of the specified type in
+    the order they are run, fileset being e.g. 1_2 for set1_data_2.
+    Files are looked up in data_dir, the directory of this script by default.
+    Every {op_type}_set{n}_data_{m}.txt file there is picked up, ordered by
+    set then data no; when there are none the standard 2 sets x 3 files are
+    returned, so reading them reports the missing files.
     '''
     
     # read & perform ops from each file in order insert, search & delete
     insert_files_set_count = 2
     insert_files_data_count = 3
     
-    file_values = {}
-    
     # Get the directory of the current script
-    current_dir = os.path.dirname(os.path.abspath(__file__))
+    current_dir = data_dir or os.path.dirname(os.path.abspath(__file__))
+    
+    file_name_pattern = re.compile(rf'{re.escape(op_type)}_set(\d+)_data_(\d+)\.txt')
+    try:
+        file_names = os.listdir(current_dir)
+    except OSError:
+        file_names = []
+    
+    filesets = []
+    for file_name in file_names:
+        match = file_name_pattern.fullmatch(file_name)
+        if match:
+            filesets.append((int(match.group(1)), int(match.group(2))))
+    filesets.sort()
+    
+    if not filesets:
+        filesets = [(set_count, data_count)
+                    for set_count in range(1, insert_files_set_count + 1)
+                    for data_count in range(1, insert_files_data_count + 1)]
+    
+    paths = []
+    for set_count, data_count in filesets:
+        file_name = f'{op_type}_set{set_count}_data_{data_count}.txt'
+        # Construct the full file path
+        paths.append((f'{set_count}_{data_count}', os.path.join(current_dir, file_name)))
+    
+    return paths
+
+def read_data_files(op_type: str = 'insert' or 'search' or 'delete', key_type=None, cache: bool = False, data_dir: str = None):
+    '''
+    Read all the files for specified type & return as a dictionary in the 
+    following format.
+    - 1_1:[] -> denotes set1_data_1: [values] 
+    - 1_2:[] -> denotes set1_data_2: [values] ...
+    Values are str unless a key_type (int, float or a key function) is given.
+    With cache=True int/float values are loaded from a binary cache next to
+    each file (see _read_cached_values), so warm runs skip text parsing.
+    '''
+    
+    read_values = _read_cached_values if cache else _read_values_from_file
+    file_values = {}
     
     # read all data files in order
-    for set_count in range(1, insert_files_set_count + 1):
-        for data_count in range(1, insert_files_data_count + 1):
-            file_name = f'{op_type}_set{set_count}_data_{data_count}.txt'
-            # Construct the full file path
-            file_path = os.path.join(current_dir, file_name)
-            
-            # set dictionary with key & values as fileset:values
-            file_values[f'{set_count}_{data_count}'] = _read_values_from_file(file_path)
+    for fileset, file_path in _data_file_paths(op_type, data_dir):
+        # set dictionary with key & values as fileset:values
+        file_values[fileset] = read_values(file_path, key_type)
     
     return file_values
 
-def compute_avg(tree_type: str = 'bst' or 'rbt' or 'st', op_type: str = 'insert' or 'search' or 'delete'):
+def stream_data_files(op_type: str = 'insert' or 'search' or 'delete', key_type=None, chunk_bytes: int = _STREAM_CHUNK_BYTES, data_dir: str = None):
+    '''
+    Streaming counterpart of read_data_files: yield (fileset, chunks) for
+    each file in order, where chunks lazily yields the file's values a chunk
+    at a time from a memory-mapped file. Nothing is read until iterated, so
+    peak memory is one chunk rather than the sum of every dataset.
+    '''
+    for fileset, file_path in _data_file_paths(op_type, data_dir):
+        yield fileset, _stream_values_from_file(file_path, key_type, chunk_bytes)
+
+def write_data_file(file_path: str, chunks, cache: bool = False):
+    '''
+    Write int keys, given as an iterable of array('q') chunks, to a data file
+    with one key per line. Only one chunk is in memory at a time, so files of
+    any size can be written. With cache=True the binary cache read by
+    read_data_files(..., cache=True) is written alongside, so even the first
+    run loads the keys without parsing the text.
+    '''
+    cache_file = None
+    if cache:
+        cache_path = _cache_path(file_path, 'q')
+        cache_file = open(f'{cache_path}.tmp', 'wb')
+        # the header needs the final size & mtime of the text file, it is filled in last
+        cache_file.write(bytes(_CACHE_HEADER.size))
+    try:
+        with open(file_path, 'w', newline='\n') as file:
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                file.write('\n'.join(map(str, chunk)))
+                file.write('\n')
+                if cache_file is not None:
+                    chunk.tofile(cache_file)
+        if cache_file is not None:
+            source_stat = os.stat(file_path)
+            cache_file.seek(0)
+            cache_file.write(_CACHE_HEADER.pack(_CACHE_MAGIC, source_stat.st_size, source_stat.st_mtime_ns))
+            cache_file.close()
+            os.replace(f'{cache_path}.tmp', cache_path)
+    finally:
+        if cache_file is not None and not cache_file.closed:
+            cache_file.close()
+            os.remove(cache_file.name)
+
+class RunningStats:
+    '''
+    Online statistics for one group of exec times. Mean & variance are
+    updated per value with Welford's method, so they stay numerically stable
+    over many iterations; the values themselves are kept for the median &
+    percentiles.
+    '''
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0  # sum of squared differences from the mean
+        self.min = float('inf')
+        self.max = float('-inf')
+        self._values = []
+    
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self._values.append(value)
+    
+    @property
+    def stddev(self):
+        # sample standard deviation, 0 for a single value
+        if self.count < 2:
+            return 0.0
+        return (self._m2 / (self.count - 1)) ** 0.5
+    
+    def percentile(self, p: float):
+        '''
+        Return the p-th percentile (0-100), interpolating linearly between
+        the closest ranks.
+        '''
+        if not self._values:
+            return 0.0
+        self._values.sort()
+        position = (len(self._values) - 1) * p / 100
+        lower = int(position)
+        upper = min(lower + 1, len(self._values) - 1)
+        fraction = position - lower
+        return self._values[lower] + (self._values[upper] - self._values[lower]) * fraction
+
+def _get_summary_header_line():
+    '''
+    Return the list of header names of the summary csv files.
+    '''
+    return ['Set', 'Data', 'Tree_type', 'Count', 'Mean', 'Stddev', 'Min', 'Max', 'Median', 'P95', 'P99']
+
+def compute_avg(tree_type: str = 'bst' or 'rbt' or 'st', op_type: str = 'insert' or 'search' or 'delete', output_dir: str = None):
     '''
-    Read the file denoted by the args & compute average for each line item, then append at the end.
+    Read the file denoted by the args once & compute the statistics of the
+    exec times for each (set, data, tree type), then write them to
+    {op_type}_{tree_type}_summary.csv. The raw results file is left as is.
+    Both files are in output_dir, the directory of this script by default.
     '''
     # Get the directory of the current script
-    current_dir = os.path.dirname(os.path.abspath(__file__))
+    current_dir = output_dir or os.path.dirname(os.path.abspath(__file__))
     file_name = f'{op_type}_{tree_type}_exec_times.csv'
     file_path = os.path.join(current_dir, file_name)
+    summary_file_name = f'{op_type}_{tree_type}_summary.csv'
+    summary_file_path = os.path.join(current_dir, summary_file_name)
+    
+    # no results were written, e.g. a run of 0 iterations
+    if not os.path.exists(file_path):
+        print(f'No results in {file_name}, summary skipped')
+        return
     
-    # dict to group exec times
-    exec_time_data = {}
+    # stats grouped by key, in the order the keys first appear
+    exec_time_stats = {}
     
-    # Read the CSV file and compute averages
+    # Read the CSV file and update the stats line by line
     with open(file_path, 'r', newline='\n') as file:
         reader = csv.reader(file)
         next(reader)  # Skip the header row
         for row in reader:
-            index, set_no, data_no, exec_time, tree_height, tree_type = row
+            index, set_no, data_no, exec_time, tree_height, tree_type = row[:6]
             key = (set_no, data_no, tree_type)
             
-            # create exec time data dict grouped by key
-            if key not in exec_time_data:
-                exec_time_data[key] = []
-            exec_time_data[key].append(float(exec_time))
-    
-    # Compute averages
-    averages = {key: sum(values) / len(values) for key, values in exec_time_data.items()}
-    
-    # Write the updated data back to the CSV file
-    temp_file_path = os.path.join(current_dir, f'temp_{file_name}')
-    with open(file_path, 'r', newline='\n') as input_file, open(temp_file_path, 'w', newline='\n') as output_file:
-        reader = csv.reader(input_file)
+            if key not in exec_time_stats:
+                exec_time_stats[key] = RunningStats()
+            exec_time_stats[key].add(float(exec_time))
+    
+    # Write the summary to a temp file first & move it in place
+    temp_file_path = os.path.join(current_dir, f'temp_{summary_file_name}')
+    with open(temp_file_path, 'w', newline='\n') as output_file:
         writer = csv.writer(output_file)
-        
-        # write the header
-        header_line = _get_csv_header_line() + ['Avg exec time']
-        writer.writerow(header_line)
-        
-        next(reader)  # Skip the header row
-        for row in reader:
-            index, set_no, data_no, exec_time, tree_height, tree_type = row
-            key = (set_no, data_no, tree_type)
-            avg_exec_time = averages[key]
-            writer.writerow(row + [f'{avg_exec_time:.6f}'])
+        writer.writerow(_get_summary_header_line())
+        for (set_no, data_no, tree_type), stats in exec_time_stats.items():
+            writer.writerow([set_no, data_no, tree_type, stats.count] + [
+                f'{value:.6f}' for value in (
+                    stats.mean, stats.stddev, stats.min, stats.max,
+                    stats.percentile(50), stats.percentile(95), stats.percentile(99))
+                ])
     
-    print(f'Averaged for {file_name}')
-    # Replace the original file with the updated one
-    os.replace(temp_file_path, file_path)
+    os.replace(temp_file_path, summary_file_path)
+    print(f'Summary written to {summary_file_name}')
 
 def _construct_line_to_write(index: int, set_no: int, data_no: int, exec_time: float, tree_height: int, tree_type: str = 'bst' or 'rbt' or 'st'):
     '''
@@ -120,53 +379,92 @@ def _construct_line_to_write(index: int, set_no: int, data_no: int, exec_time: f
     '''
     return f'{index},{set_no},{data_no},{exec_time},{tree_height},{tree_type}'
 
-def remove_file(tree_type: str = 'bst' or 'rbt' or 'st', op_type: str = 'insert' or 'search' or 'delete'):
+def get_lines_to_write(index: int, exec_times: tuple, tree_type: str = 'bst' or 'rbt' or 'st', filesets: list = None):
     '''
-    Removes .csv file from disk as per the provided args.
-    This is necessary before running each averaging function.
+    Create the csv lines for one iteration from the (exec times in seconds,
+    tree heights) of its data files. filesets names the files in order
+    (e.g. 1_2 for set1_data_2) and defaults to the six standard ones.
     '''
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    file_name = f'{op_type}_{tree_type}_exec_times.csv'
-    file_path = os.path.join(current_dir, file_name)
+    times, tree_heights = exec_times
+    if filesets is None:
+        filesets = [fileset for fileset, _ in _data_file_paths()]
+    
+    lines = []
+    for fileset, exec_time, tree_height in zip(filesets, times, tree_heights):
+        set_no, data_no = fileset.split('_')
+        lines.append(_construct_line_to_write(index, set_no, data_no, exec_time, tree_height, tree_type))
     
-    if os.path.exists(file_path):
-        try:
-            os.remove(file_path)
-            print(f'Existing file deleted successfully: {file_name}')
-        except OSError as e:
-            print(f'Error deleting file {file_name}: {e}')
-    else:
-        print(f'File not found: {file_name}')
+    return lines
 
-def write_to_file(line: str, tree_type: str = 'bst' or 'rbt' or 'st', op_type: str = 'insert' or 'search' or 'delete'):
+class ResultWriter:
     '''
-    Write the provided line to file specified.
+    Buffered writer for the {op_type}_{tree_type}_exec_times.csv result files.
+    Keeps one open, buffered handle per (tree_type, op_type) instead of
+    reopening the csv for every line. Lines go to a temp file next to the
+    csv, which finalize() flushes & atomically moves over the csv, so a
+    failed run never leaves a half written result file behind.
+    Use as a context manager to finalize on success & discard on error.
+    Files are written to output_dir, the directory of this script by default.
     '''
-    # Get the directory of the current script
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    file_name = f'{op_type}_{tree_type}_exec_times.csv'
-    file_path = os.path.join(current_dir, file_name)
     
-    print(f'Writing to file: {file_name}')
+    def __init__(self, buffer_size: int = 1 << 16, output_dir: str = None):
+        self.buffer_size = buffer_size
+        self.output_dir = output_dir or os.path.dirname(os.path.abspath(__file__))
+        # (tree_type, op_type) -> (open temp file, final file path)
+        self._files = {}
     
-    # Check if the file exists, and if not, write the header
-    if not os.path.exists(file_path):
-        with open(file_path, 'w', newline='\n') as file:
-            header = ','.join(_get_csv_header_line())
-            file.write(header + '\n')
+    def _get_file(self, tree_type: str, op_type: str):
+        key = (tree_type, op_type)
+        if key not in self._files:
+            file_path = os.path.join(self.output_dir, f'{op_type}_{tree_type}_exec_times.csv')
+            file = open(f'{file_path}.tmp', 'w', newline='\n', buffering=self.buffer_size)
+            file.write(','.join(_get_csv_header_line()) + '\n')
+            self._files[key] = (file, file_path)
+        return self._files[key][0]
     
-    with open(file_path, 'a', newline='\n') as file:
-        file.write(line + '\n')
-
-def get_lines_to_write(index: int, exec_times: tuple, tree_type: str = 'bst' or 'rbt' or 'st'):
-    ([one_1, one_2, one_3, two_1, two_2, two_3], [h_one_1, h_one_2, h_one_3, h_two_1, h_two_2, h_two_3]) = exec_times
-    lines = []
+    def write(self, line: str, tree_type: str = 'bst' or 'rbt' or 'st', op_type: str = 'insert' or 'search' or 'delete'):
+        '''
+        Buffer a single line for the file specified.
+        '''
+        self._get_file(tree_type, op_type).write(line + '\n')
+    
+    def write_lines(self, lines: list, tree_type: str = 'bst' or 'rbt' or 'st', op_type: str = 'insert' or 'search' or 'delete'):
+        '''
+        Buffer a batch of lines for the file specified.
+        '''
+        self._get_file(tree_type, op_type).writelines(line + '\n' for line in lines)
+    
+    def flush(self):
+        '''
+        Push all buffered lines to their temp files.
+        '''
+        for file, _ in self._files.values():
+            file.flush()
+    
+    def finalize(self):
+        '''
+        Flush & close every file, then move each temp file over its csv.
+        '''
+        for file, file_path in self._files.values():
+            file.close()
+            os.replace(file.name, file_path)
+            print(f'Written to file: {os.path.basename(file_path)}')
+        self._files = {}
+    
+    def discard(self):
+        '''
+        Close & delete every temp file, leaving the existing csv files as they were.
+        '''
+        for file, _ in self._files.values():
+            file.close()
+            os.remove(file.name)
+        self._files = {}
     
-    lines.append(_construct_line_to_write(index, 1, 1, one_1.total_seconds(), h_one_1, tree_type))
-    lines.append(_construct_line_to_write(index, 1, 2, one_2.total_seconds(), h_one_2, tree_type))
-    lines.append(_construct_line_to_write(index, 1, 3, one_3.total_seconds(), h_one_3, tree_type))
-    lines.append(_construct_line_to_write(index, 2, 1, two_1.total_seconds(), h_two_1, tree_type))
-    lines.append(_construct_line_to_write(index, 2, 2, two_2.total_seconds(), h_two_2, tree_type))
-    lines.append(_construct_line_to_write(index, 2, 3, two_3.total_seconds(), h_two_3, tree_type))
+    def __enter__(self):
+        return self
     
-    return lines
\ No newline at end of file
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.finalize()
+        else:
+            self.discard()
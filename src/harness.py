@@ -0,0 +1,253 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Value
+from file_utils import read_data_files, stream_data_files, get_lines_to_write, compute_avg, ResultWriter
+from timing import Timer
+
+__all__ = [
+    'OP_TYPES',
+    'StreamedFiles',
+    'run_op',
+    'read_op_files',
+    'load_datasets',
+    'build_tree',
+    'run_iteration',
+    'run_benchmark',
+    'average_exec_times',
+    'run_benchmarks_parallel',
+    ]
+
+OP_TYPES = ('insert', 'search', 'delete')
+
+
+class StreamedFiles:
+    '''
+    Stand-in for the {fileset: values} dict of read_data_files that streams
+    the int keys of each data file of op_type from disk, a chunk at a time,
+    every time it is iterated (as the (fileset, chunks) pairs of
+    stream_data_files). No data file is ever held in memory in full, so
+    files of any size can be replayed.
+    '''
+
+    def __init__(self, op_type: str = 'insert' or 'search' or 'delete', data_dir: str = None):
+        self.op_type = op_type
+        self.data_dir = data_dir
+
+    def __iter__(self):
+        return stream_data_files(self.op_type, int, data_dir=self.data_dir)
+
+def _file_chunks(file_values):
+    '''
+    Return the (fileset, chunks) pairs of file_values, either a
+    {fileset: values} dict, each file's values being one chunk, or streamed
+    files that are already such pairs.
+    '''
+    if isinstance(file_values, dict):
+        return ((fileset, (values,)) for fileset, values in file_values.items())
+    return file_values
+
+def _filesets(file_values):
+    # the filesets in file order, without reading a streamed file
+    return [fileset for fileset, _ in _file_chunks(file_values)]
+
+def run_op(tree, op_type: str = 'insert' or 'search' or 'delete', file_values: dict = None, disable_gc: bool = False):
+    '''
+    Call tree.<op_type>(value) for each value of every data file in
+    file_values, timing each file, and return (exec_times, tree_heights)
+    with one entry per file. file_values is either the {fileset: values}
+    of read_data_files or (fileset, chunks) pairs as stream_data_files (or
+    StreamedFiles) yields them, where only the ops on each chunk are timed,
+    not reading it.
+    Any tree exposing insert/search/delete & tree_height() can be driven.
+    '''
+    op = getattr(tree, op_type)
+
+    # execution times for each file
+    exec_times = []
+
+    # tree heights after each file
+    tree_heights = []
+
+    for _, chunks in _file_chunks(file_values):
+        elapsed_ns = 0
+        for chunk in chunks:
+            with Timer(disable_gc) as timer:
+                for value in chunk:
+                    op(value)
+            elapsed_ns += timer.elapsed_ns
+
+        # add execution time for each file
+        exec_times.append(elapsed_ns / 1e9)
+
+        # add tree_height for each file
+        tree_heights.append(tree.tree_height()[0])
+
+    return (exec_times, tree_heights)
+
+def read_op_files(op_type: str = 'insert' or 'search' or 'delete', data_dir: str = None, stream: bool = False):
+    '''
+    Return the int keys of the data files of op_type as {fileset: values},
+    read through the binary caches, or with stream=True as StreamedFiles.
+    '''
+    if stream:
+        return StreamedFiles(op_type, data_dir)
+    return read_data_files(op_type, int, cache=True, data_dir=data_dir)
+
+def load_datasets(op_types: tuple = OP_TYPES, data_dir: str = None, stream: bool = False):
+    '''
+    Read the int keys of the data files for each op type once, plus the
+    insert files that search & delete runs build their tree from.
+    Returns {op_type: {fileset: values}}, or with stream=True
+    {op_type: StreamedFiles}, which read nothing up front & stream the
+    files from disk on every pass instead.
+    '''
+    needed = set(op_types) | {'insert'}
+    return {op_type: read_op_files(op_type, data_dir, stream) for op_type in OP_TYPES if op_type in needed}
+
+def build_tree(make_tree, datasets: dict = None):
+    '''
+    Return a tree from make_tree() holding the keys of the insert files.
+    '''
+    tree = make_tree()
+    for _, chunks in _file_chunks(datasets['insert']):
+        for chunk in chunks:
+            for value in chunk:
+                tree.insert(value)
+    return tree
+
+def run_iteration(make_tree, op_type: str = 'insert' or 'search' or 'delete', datasets: dict = None,
+                  disable_gc: bool = False, base_tree=None):
+    '''
+    Run one timed pass of op_type on a fresh tree from make_tree(). Search &
+    delete run on a clone() of base_tree, the tree built from the insert
+    files, which is built here (untimed) when not given.
+    '''
+    if op_type == 'insert':
+        tree = make_tree()
+    elif base_tree is not None:
+        tree = base_tree.clone()
+    else:
+        tree = build_tree(make_tree, datasets)
+    return run_op(tree, op_type, datasets[op_type], disable_gc)
+
+def _collect_records(tree_type: str, op_type: str, iteration: int, filesets: list, exec_times: tuple, writer=None):
+    '''
+    Turn the (exec_times, tree_heights) of one iteration into records, one
+    per data file, & write them through the writer when one is given.
+    '''
+    records = []
+    for fileset, exec_time, tree_height in zip(filesets, *exec_times):
+        records.append({
+            'tree': tree_type,
+            'op': op_type,
+            'iteration': iteration,
+            'fileset': fileset,
+            'exec_time': exec_time,
+            'tree_height': tree_height,
+            })
+    if writer is not None:
+        writer.write_lines(get_lines_to_write(iteration, exec_times, tree_type, filesets), tree_type, op_type)
+    return records
+
+def run_benchmark(make_tree, tree_type: str, op_type: str = 'insert' or 'search' or 'delete', datasets: dict = None,
+                  iterations: int = 3, warmup: int = 0, disable_gc: bool = False, writer=None):
+    '''
+    Run `warmup` unrecorded plus `iterations` recorded passes of op_type &
+    return one record (dict) per iteration & data file. When a ResultWriter
+    is given the records are also written to its csv for the tree & op.
+    '''
+    filesets = _filesets(datasets[op_type])
+    # every search & delete pass starts from a copy of the same prebuilt tree
+    base_tree = build_tree(make_tree, datasets) if op_type != 'insert' else None
+    records = []
+    for i in range(warmup + iterations):
+        exec_times = run_iteration(make_tree, op_type, datasets, disable_gc, base_tree)
+        # warmup runs are not recorded
+        if i < warmup:
+            continue
+
+        records += _collect_records(tree_type, op_type, i - warmup, filesets, exec_times, writer)
+
+    return records
+
+def average_exec_times(make_tree, tree_type: str, op_type: str = 'insert' or 'search' or 'delete', iterations: int = 3,
+                       warmup: int = 0, disable_gc: bool = False, data_dir: str = None, output_dir: str = None):
+    '''
+    Run run_benchmark for one tree & op on the data files, writing every
+    iteration to {op_type}_{tree_type}_exec_times.csv, then summarize the
+    runs with compute_avg. This is what each tree module's
+    avg_exec_time_* functions call.
+    '''
+    datasets = load_datasets((op_type,), data_dir)
+    with ResultWriter(output_dir=output_dir) as writer:
+        run_benchmark(make_tree, tree_type, op_type, datasets, iterations, warmup, disable_gc, writer)
+    compute_avg(tree_type, op_type, output_dir)
+
+# datasets loaded once by each worker process of run_benchmarks_parallel
+_worker_datasets = None
+
+# trees built from the insert files by each worker, by tree type, which the
+# worker's search & delete jobs clone instead of building their own
+_worker_trees = {}
+
+def _init_worker(op_types: tuple, data_dir: str, stream: bool, cpus: list, next_cpu):
+    '''
+    Set up a worker process: pin it to the next cpu of cpus (round robin,
+    when pinning is on) & load the datasets it will run on.
+    '''
+    global _worker_datasets
+    if cpus:
+        with next_cpu.get_lock():
+            cpu = cpus[next_cpu.value % len(cpus)]
+            next_cpu.value += 1
+        os.sched_setaffinity(0, {cpu})
+    _worker_datasets = load_datasets(op_types, data_dir, stream)
+
+def _run_job(tree_type: str, make_tree, op_type: str, warmup: int, disable_gc: bool):
+    # one (tree, op, iteration) job, after its own unrecorded warmup runs
+    base_tree = None
+    if op_type != 'insert':
+        if tree_type not in _worker_trees:
+            _worker_trees[tree_type] = build_tree(make_tree, _worker_datasets)
+        base_tree = _worker_trees[tree_type]
+    for _ in range(warmup):
+        run_iteration(make_tree, op_type, _worker_datasets, disable_gc, base_tree)
+    return run_iteration(make_tree, op_type, _worker_datasets, disable_gc, base_tree)
+
+def run_benchmarks_parallel(engines: dict, op_types: tuple = OP_TYPES, iterations: int = 3, warmup: int = 0,
+                            disable_gc: bool = False, workers: int = None, cpus: list = None,
+                            data_dir: str = None, writer=None, stream: bool = False):
+    '''
+    Run every (tree, op, iteration) job of engines ({tree_type: make_tree})
+    x op_types x iterations across a ProcessPoolExecutor of `workers`
+    processes (os.cpu_count() by default). Each job runs `warmup`
+    unrecorded passes first since it may land on a cold worker.
+    With cpus (a list of cpu ids) each worker is pinned to one of them.
+    With stream=True the workers stream the data files (see load_datasets).
+    Results are merged in job order, not completion order, so the records &
+    csv lines come out exactly as a serial run would write them.
+    '''
+    if cpus:
+        if not hasattr(os, 'sched_setaffinity'):
+            raise OSError('CPU pinning is not supported on this platform')
+        unusable = set(cpus) - os.sched_getaffinity(0)
+        if unusable:
+            raise ValueError(f'CPUs not available to this process: {sorted(unusable)}')
+
+    datasets = load_datasets(op_types, data_dir, stream)
+    jobs = [(tree_type, op_type, iteration)
+            for tree_type in engines
+            for op_type in op_types
+            for iteration in range(iterations)]
+
+    records = []
+    next_cpu = Value('i', 0)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(tuple(op_types), data_dir, stream, cpus, next_cpu)) as executor:
+        futures = [executor.submit(_run_job, tree_type, engines[tree_type], op_type, warmup, disable_gc)
+                   for tree_type, op_type, _ in jobs]
+        for (tree_type, op_type, iteration), future in zip(jobs, futures):
+            filesets = _filesets(datasets[op_type])
+            records += _collect_records(tree_type, op_type, iteration, filesets, future.result(), writer)
+
+    return records
@@ -0,0 +1,64 @@
+import gc
+import time
+
+__all__ = [
+    'Timer',
+    'measure',
+    ]
+
+
+class Timer:
+    '''
+    Context manager timing the block it wraps with time.perf_counter_ns,
+    which is monotonic & high resolution unlike datetime.now(). With
+    disable_gc=True the garbage collector is switched off for the timed
+    region (and restored after) so collections don't land in the timings.
+    '''
+
+    def __init__(self, disable_gc: bool = False):
+        self.disable_gc = disable_gc
+        self.elapsed_ns = 0
+        self._gc_was_enabled = False
+        self._start = 0
+
+    def __enter__(self):
+        if self.disable_gc:
+            self._gc_was_enabled = gc.isenabled()
+            gc.disable()
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.elapsed_ns = time.perf_counter_ns() - self._start
+        if self.disable_gc and self._gc_was_enabled:
+            gc.enable()
+
+    @property
+    def elapsed(self):
+        # elapsed time in seconds
+        return self.elapsed_ns / 1e9
+
+def measure(func, setup=None, warmup: int = 0, repeat: int = 1, policy=min, disable_gc: bool = False):
+    '''
+    Time func() over `repeat` runs after `warmup` untimed runs & return the
+    runs' times in seconds reduced by policy (min by default, the least
+    noisy estimate; pass e.g. statistics.mean or list for all the times).
+    setup() is called untimed before every run & its result, if not None,
+    is passed to func, e.g. to hand each run a freshly built tree.
+    '''
+    def run(timed):
+        args = ()
+        if setup is not None:
+            prepared = setup()
+            if prepared is not None:
+                args = (prepared,)
+        if not timed:
+            func(*args)
+            return 0
+        with Timer(disable_gc) as timer:
+            func(*args)
+        return timer.elapsed
+
+    for _ in range(warmup):
+        run(False)
+    return policy([run(True) for _ in range(repeat)])
@@ -0,0 +1,122 @@
+'''
+Helpers shared by the tree modules.
+'''
+from bisect import bisect_left
+
+
+def check_sorted(values):
+    '''
+    Return values as a list, raising ValueError if they are not in ascending order.
+    '''
+    values = list(values)
+    for i in range(1, len(values)):
+        if values[i] < values[i - 1]:
+            raise ValueError('Values must be in ascending order')
+    return values
+
+def run_lengths(values):
+    '''
+    Split sorted values into the distinct values & the no of copies of each.
+    '''
+    unique = []
+    counts = []
+    for value in values:
+        if unique and value == unique[-1]:
+            counts[-1] += 1
+        else:
+            unique.append(value)
+            counts.append(1)
+    return unique, counts
+
+# smallest batch search_many pushes down the tree together; below it, & below
+# 1/16 of the tree size, the batch shares too few nodes to pay for the sort &
+# the bisects, so every key is searched on its own
+BATCH_SEARCH_MIN = 4096
+
+def search_many(root, keys, contains, key_of, left_of, right_of, size: int = 0, null=None):
+    '''
+    Look up a batch of keys in the binary search tree at root & return a
+    presence mask in input order. The distinct keys are sorted and pushed
+    down the tree together, each node splitting its slice of the batch with
+    bisect, so nodes shared by several search paths are visited once instead
+    of once per key. key_of/left_of/right_of read a node's key & children,
+    null is the empty child (None or a sentinel) & size the no of keys in
+    the tree. Batches under BATCH_SEARCH_MIN keys or size // 16 call
+    contains(key) for each key instead.
+    '''
+    keys = list(keys)
+    if len(keys) < max(BATCH_SEARCH_MIN, size // 16):
+        return [contains(key) for key in keys]
+    if root is null:
+        return [False] * len(keys)
+    queries = sorted(set(keys))
+    found = set()
+    stack = [(root, 0, len(queries))]
+    while stack:
+        node, lo, hi = stack.pop()
+        node_key = key_of(node)
+        i = bisect_left(queries, node_key, lo, hi)
+        j = i
+        if i < hi and queries[i] == node_key:
+            found.add(node_key)
+            j = i + 1
+        if lo < i:
+            left = left_of(node)
+            if left is not null:
+                stack.append((left, lo, i))
+        if j < hi:
+            right = right_of(node)
+            if right is not null:
+                stack.append((right, j, hi))
+    return [key in found for key in keys]
+
+def iter_keys(root, key_of, left_of, right_of, count_of, null=None):
+    '''
+    Yield the keys of the binary search tree at root in ascending order,
+    lazily, holding at most one stack entry per level of the tree. Each key
+    is yielded count_of(node) times, so multiset keys come once per copy.
+    key_of/left_of/right_of/null are as in search_many.
+    '''
+    stack = []
+    node = root
+    while stack or node is not null:
+        while node is not null:
+            stack.append(node)
+            node = left_of(node)
+        node = stack.pop()
+        key = key_of(node)
+        for _ in range(count_of(node)):
+            yield key
+        node = right_of(node)
+
+def reverse_keys(root, key_of, left_of, right_of, count_of, null=None):
+    '''
+    Yield the keys of the tree at root in descending order, lazily, like
+    iter_keys.
+    '''
+    yield from iter_keys(root, key_of, right_of, left_of, count_of, null)
+
+def keys_between(root, lo, hi, key_of, left_of, right_of, count_of, null=None):
+    '''
+    Yield the keys of the tree at root with lo <= key <= hi in ascending
+    order in O(h + k) for k keys in the range, like iter_keys. Subtrees
+    entirely below lo are skipped.
+    '''
+    stack = []
+    node = root
+    while True:
+        while node is not null:
+            if key_of(node) < lo:
+                node = right_of(node)
+            else:
+                stack.append(node)
+                node = left_of(node)
+        if not stack:
+            return
+        node = stack.pop()
+        key = key_of(node)
+        if key > hi:
+            return
+        for _ in range(count_of(node)):
+            yield key
+        node = right_of(node)